@@ -2,7 +2,8 @@
 from PIL import Image, ImageDraw
 import math
 import random
-import colorsys
+from colorspace import hsv_to_rgb8
+from gradient import profile_image
 
 # Set the dimensions for HD mobile (1080x1920)
 WIDTH = 1080
@@ -14,12 +15,9 @@ draw = ImageDraw.Draw(img)
 
 # Generate a smooth gradient background
 def create_gradient(width, height, color1, color2):
-    for y in range(height):
-        # Interpolate between color1 and color2 based on y position
-        r = int(color1[0] + (color2[0] - color1[0]) * y / height)
-        g = int(color1[1] + (color2[1] - color1[1]) * y / height)
-        b = int(color1[2] + (color2[2] - color1[2]) * y / height)
-        draw.line([(0, y), (width, y)], fill=(r, g, b))
+    # Interpolate between color1 and color2 based on y position
+    channels = [lambda y, c1=c1, c2=c2: c1 + (c2 - c1) * y / height for c1, c2 in zip(color1, color2)]
+    img.paste(profile_image(width, height, channels))
 
 # Choose two vibrant colors for the gradient
 color1 = (random.randint(0, 100), random.randint(0, 100), random.randint(100, 255))
@@ -79,7 +77,7 @@ for _ in range(8):
     h = random.random()
     s = 0.7 + random.random() * 0.3
     v = 0.7 + random.random() * 0.3
-    r, g, b = [int(c * 255) for c in colorsys.hsv_to_rgb(h, s, v)]
+    r, g, b = hsv_to_rgb8(h, s, v).tolist()
     
     draw_sphere(draw, (x, y), radius, (r, g, b))
 
@@ -91,7 +89,7 @@ for _ in range(15):
     h = random.random()
     s = 0.3 + random.random() * 0.2
     v = 0.8 + random.random() * 0.2
-    r, g, b = [int(c * 255) for c in colorsys.hsv_to_rgb(h, s, v)]
+    r, g, b = hsv_to_rgb8(h, s, v).tolist()
     
     for r2 in range(radius, radius - 20, -1):
         alpha = int(30 * (r2 / radius))
@@ -110,7 +108,7 @@ for _ in range(5):
     h = random.random()
     s = 0.7 + random.random() * 0.3
     v = 0.7 + random.random() * 0.3
-    r, g, b = [int(c * 255) for c in colorsys.hsv_to_rgb(h, s, v)]
+    r, g, b = hsv_to_rgb8(h, s, v).tolist()
     draw.line([x1, y1, x2, y2], fill=(r, g, b), width=width)
 
 # Save the image
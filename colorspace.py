@@ -0,0 +1,118 @@
+
+import numpy as np
+
+# Array versions of the colorsys conversions. Every function takes scalars or
+# NumPy arrays (broadcast against each other) with components in 0..1 and
+# gives the same results as colorsys, element for element.
+
+def hsv_to_rgb(h, s, v):
+    """Vectorized colorsys.hsv_to_rgb"""
+    h, s, v = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (h, s, v)))
+    i = np.trunc(h * 6.0)
+    f = (h * 6.0) - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = np.mod(i, 6).astype(np.int8)
+
+    sector = [i == k for k in range(5)]
+    r = np.select(sector, [v, q, p, p, t], v)
+    g = np.select(sector, [t, v, v, q, p], p)
+    b = np.select(sector, [p, p, t, v, v], q)
+
+    grey = s == 0.0
+    return np.where(grey, v, r), np.where(grey, v, g), np.where(grey, v, b)
+
+def rgb_to_hsv(r, g, b):
+    """Vectorized colorsys.rgb_to_hsv"""
+    r, g, b = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (r, g, b)))
+    maxc = np.maximum(np.maximum(r, g), b)
+    minc = np.minimum(np.minimum(r, g), b)
+    rangec = maxc - minc
+    v = maxc
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.where(minc == maxc, 0.0, rangec / maxc)
+        rc = (maxc - r) / rangec
+        gc = (maxc - g) / rangec
+        bc = (maxc - b) / rangec
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.where(minc == maxc, 0.0, np.mod(h / 6.0, 1.0))
+    return h, s, v
+
+def _hls_value(m1, m2, hue):
+    hue = np.mod(hue, 1.0)
+    return np.select(
+        [hue < 1 / 6, hue < 0.5, hue < 2 / 3],
+        [m1 + (m2 - m1) * hue * 6.0, m2, m1 + (m2 - m1) * (2 / 3 - hue) * 6.0],
+        m1,
+    )
+
+def hls_to_rgb(h, l, s):
+    """Vectorized colorsys.hls_to_rgb (HSL with colorsys' argument order)"""
+    h, l, s = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (h, l, s)))
+    m2 = np.where(l <= 0.5, l * (1.0 + s), l + s - (l * s))
+    m1 = 2.0 * l - m2
+
+    grey = s == 0.0
+    r = _hls_value(m1, m2, h + 1 / 3)
+    g = _hls_value(m1, m2, h)
+    b = _hls_value(m1, m2, h - 1 / 3)
+    return np.where(grey, l, r), np.where(grey, l, g), np.where(grey, l, b)
+
+def rgb_to_hls(r, g, b):
+    """Vectorized colorsys.rgb_to_hls"""
+    r, g, b = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (r, g, b)))
+    maxc = np.maximum(np.maximum(r, g), b)
+    minc = np.minimum(np.minimum(r, g), b)
+    sumc = maxc + minc
+    rangec = maxc - minc
+    l = sumc / 2.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.where(l <= 0.5, rangec / sumc, rangec / (2.0 - maxc - minc))
+        rc = (maxc - r) / rangec
+        gc = (maxc - g) / rangec
+        bc = (maxc - b) / rangec
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.mod(h / 6.0, 1.0)
+
+    grey = minc == maxc
+    return np.where(grey, 0.0, h), l, np.where(grey, 0.0, s)
+
+def to_rgb8(r, g, b):
+    """Stack 0..1 float channels into uint8 RGB, truncating like int(x * 255)"""
+    return (np.stack([r, g, b], axis=-1) * 255).astype(np.uint8)
+
+def hsv_to_rgb8(h, s, v):
+    """hsv_to_rgb straight to a (..., 3) uint8 array; a single color gives shape (3,)"""
+    return to_rgb8(*hsv_to_rgb(h, s, v))
+
+def build_lut(color_fn, size=256):
+    """Precompute a (size, 3) uint8 palette from color_fn(t), t running over 0..1
+
+    color_fn receives the whole t array at once and returns r, g, b
+    channels in 0..1, e.g. lambda t: hsv_to_rgb(t, 1.0, 1.0).
+    """
+    t = np.arange(size) / (size - 1)
+    return to_rgb8(*color_fn(t))
+
+def apply_lut(values, lut, vmin=0.0, vmax=1.0, out=None):
+    """Map a scalar field onto a palette with a single fancy-indexing op
+
+    values between vmin and vmax are spread over the lut's entries (and
+    clipped outside that range); out may be a preallocated (..., 3) uint8
+    array to write into. An empty range (vmax <= vmin, e.g. a constant
+    field) maps everything to the last entry, as np.interp does.
+    """
+    values = np.asarray(values)
+    if vmax <= vmin:
+        index = np.full(values.shape, len(lut) - 1, dtype=np.intp)
+    else:
+        scale = (len(lut) - 1) / (vmax - vmin)
+        index = np.clip((values - vmin) * scale, 0, len(lut) - 1).astype(np.intp)
+    return np.take(lut, index, axis=0, out=out)
+
+def rainbow_lut(size=256, saturation=1.0, value=1.0):
+    """Full-circle hue ramp at fixed saturation and value"""
+    return build_lut(lambda t: hsv_to_rgb(t, saturation, value), size)
@@ -1,11 +1,9 @@
 
-from PIL import Image, ImageDraw
+from indexed import render_shapes
 import random
 
 # Dimensions for mobile
 WIDTH, HEIGHT = 1080, 1920
-image = Image.new("RGB", (WIDTH, HEIGHT), "#1C2526")
-draw = ImageDraw.Draw(image)
 
 # Gradient color function
 def get_gradient_color(t):
@@ -16,18 +14,19 @@ def get_gradient_color(t):
     b = int(start_color[2] + (end_color[2] - start_color[2]) * t)
     return (r, g, b)
 
-# Draw 10 sets of concentric circles
+# Lay out 10 sets of concentric circles
+circles = []
 for _ in range(10):
     center_x, center_y = random.randint(100, WIDTH-100), random.randint(100, HEIGHT-100)
     max_radius = random.randint(50, 150)
     for r in range(10, max_radius, 10):
         t = r / max_radius  # Normalize for gradient
         color = get_gradient_color(t)
-        draw.ellipse(
-            (center_x - r, center_y - r, center_x + r, center_y + r),
-            fill=color,
-            outline="#FFFFFF"
-        )
+        circles.append(("ellipse", (center_x - r, center_y - r, center_x + r, center_y + r),
+                        {"fill": color, "outline": "#FFFFFF"}))
+
+# Draw them over a dark background, on a palette of the ring colors
+image = render_shapes(WIDTH, HEIGHT, "#1C2526", circles)
 
 # Save
 image.save("concentric_circles_wallpaper.png")
@@ -0,0 +1,71 @@
+
+from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import os
+
+# Portrait sizes every wallpaper ships at; render once at DEVICE_MASTER and
+# derive the rest with device_variants
+DEVICE_SIZES = {
+    "fhd": (1080, 1920),
+    "qhd": (1440, 2560),
+    "qhd_tall": (1440, 3040),
+    "uhd": (2160, 3840),
+}
+DEVICE_MASTER = (2160, 3840)
+
+def device_crop(width, height, target_width, target_height):
+    """Centered (left, top, right, bottom) box of a width x height frame with the target's aspect ratio"""
+    if width * target_height > height * target_width:
+        crop_width, crop_height = height * target_width / target_height, height
+    else:
+        crop_width, crop_height = width, width * target_height / target_width
+    left, top = (width - crop_width) / 2, (height - crop_height) / 2
+    return (left, top, left + crop_width, top + crop_height)
+
+def halve(rgb):
+    """One area-averaging pyramid step: each output pixel is the rounded mean of a 2x2 block"""
+    height, width = rgb.shape[0] // 2 * 2, rgb.shape[1] // 2 * 2
+    blocks = rgb[:height, :width].astype(np.uint16)
+    total = blocks[0::2, 0::2] + blocks[1::2, 0::2] + blocks[0::2, 1::2] + blocks[1::2, 1::2]
+    return ((total + 2) // 4).astype(np.uint8)
+
+def device_variants(image, sizes=DEVICE_SIZES):
+    """Every device size of one rendered image, as {name: PIL image}
+
+    Each size is cropped to its aspect ratio, then taken from the smallest
+    pyramid level still at least as large, so halvings are shared between
+    sizes. The last (fractional) step is PIL's area-averaging BOX resample.
+    """
+    pyramid = [np.asarray(image.convert("RGB"))]
+    variants = {}
+    for name, (target_width, target_height) in sizes.items():
+        height, width = pyramid[0].shape[:2]
+        box = device_crop(width, height, target_width, target_height)
+        crop_width, crop_height = box[2] - box[0], box[3] - box[1]
+
+        level = 0
+        while crop_width / 2 ** (level + 1) >= target_width and crop_height / 2 ** (level + 1) >= target_height:
+            level += 1
+        while len(pyramid) <= level:
+            pyramid.append(halve(pyramid[-1]))
+
+        source = Image.fromarray(pyramid[level], "RGB")
+        scaled_box = tuple(edge / 2 ** level for edge in box)
+        if source.size == (target_width, target_height) and scaled_box == (0, 0, target_width, target_height):
+            variants[name] = source
+        else:
+            variants[name] = source.resize((target_width, target_height), Image.BOX, box=scaled_box)
+    return variants
+
+def save_device_variants(image, filename, sizes=DEVICE_SIZES, **save_options):
+    """Write image at every device size as <stem>_<device><ext>, encoding all of them concurrently
+
+    Returns the list of paths written.
+    """
+    stem, ext = os.path.splitext(filename)
+    variants = device_variants(image, sizes)
+    paths = [f"{stem}_{name}{ext}" for name in variants]
+    with ThreadPoolExecutor(len(variants)) as pool:
+        list(pool.map(lambda item: item[0].save(item[1], **save_options), zip(variants.values(), paths)))
+    return paths
@@ -0,0 +1,60 @@
+
+from contextlib import contextmanager, suppress
+import os
+
+@contextmanager
+def atomic_file(path):
+    """Binary file that only appears at path once the block completes; on error nothing is left behind
+
+    It is written under a temporary name next to path and moved into place
+    with os.replace, so a reader (or a second process sharing a cache
+    directory) never sees a partial file.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            yield f
+        os.replace(temp_path, path)
+    except BaseException:
+        # open() itself may have failed, e.g. for a missing directory
+        with suppress(FileNotFoundError):
+            os.unlink(temp_path)
+        raise
+
+# Eviction frees a cache directory down to this fraction of its budget, so
+# the next scan is many writes away
+EVICT_TO = 0.9
+
+# Bytes of matching files in each (directory, prefix, suffix), kept up to
+# date as files are added
+_directory_bytes = {}
+
+def evict_lru(directory, budget, added=0, prefix="", suffix="", keep=None):
+    """Account for `added` new bytes in directory and, once over budget, delete least recently used files
+
+    Only files named prefix...suffix count. The total is kept in memory, so
+    the directory is only scanned on first use and when it goes over
+    budget; files are then deleted oldest mtime first (refresh it on every
+    hit) down to EVICT_TO of the budget. keep, the file just written, is
+    never deleted, even when it alone is over budget.
+    """
+    key = (directory, prefix, suffix)
+    total = _directory_bytes.get(key)
+    if total is None or total + added > budget:
+        files = []
+        for entry in os.scandir(directory):
+            if entry.name.startswith(prefix) and entry.name.endswith(suffix):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        if total > budget:
+            for _, size, path in sorted(files):
+                if total <= budget * EVICT_TO:
+                    break
+                if keep is not None and os.path.samefile(path, keep):
+                    continue
+                total -= size
+                os.remove(path)
+    else:
+        total += added
+    _directory_bytes[key] = total
@@ -1,15 +1,18 @@
 
-from PIL import Image, ImageDraw
+from PIL import ImageDraw
+from indexed import indexed_image
 import math  # Added import for math module
 
 # Dimensions
 WIDTH, HEIGHT = 1080, 1920
-image = Image.new("RGB", (WIDTH, HEIGHT), "#000000")
-draw = ImageDraw.Draw(image)
 
 # Color
 color = "#FF6F61"  # Coral
 
+# Black background, on a palette of the fill and outline colors
+image = indexed_image(WIDTH, HEIGHT, "#000000", [color, "#FFFFFF"])
+draw = ImageDraw.Draw(image)
+
 # Recursive Sierpinski triangle function
 def draw_sierpinski(draw, x1, y1, x2, y2, x3, y3, level):
     if level == 0:
@@ -1,5 +1,5 @@
 
-from PIL import Image, ImageDraw
+from gradient import save_gradient
 import random
 import os
 
@@ -16,68 +16,12 @@ def generate_gradient_wallpaper(width, height, colors, filename="gradient_wallpa
                   Defaults to "gradient_wallpaper.png".
     """
 
-    img = Image.new('RGB', (width, height))
-    draw = ImageDraw.Draw(img)
-
-    num_colors = len(colors)
-    if num_colors == 0:
+    if len(colors) == 0:
         print("Error: No colors provided.  Using default black and white.")
         colors = [(0, 0, 0), (255, 255, 255)]
-        num_colors = 2
-
-
-    # Linear Gradient
-    if num_colors == 2:
-        color1 = colors[0]
-        color2 = colors[1]
-
-        for i in range(height):
-            # Calculate the ratio (0.0 to 1.0) based on the height
-            ratio = float(i) / height
-
-            # Interpolate the RGB values
-            r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-            g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-            b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-
-            # Draw a line
-            draw.line((0, i, width, i), fill=(r, g, b))
-
-
-    # Multi-color Gradient
-    else:
-        color_stops = [(i / (num_colors - 1)) for i in range(num_colors)]  # Position of each color
-
-        for i in range(height):
-            # Calculate the ratio (0.0 to 1.0) based on the height
-            ratio = float(i) / height
-
-            # Find the two color stops that the ratio falls between
-            for j in range(len(color_stops) - 1):
-                if color_stops[j] <= ratio <= color_stops[j + 1]:
-                    stop1 = color_stops[j]
-                    stop2 = color_stops[j + 1]
-                    color1 = colors[j]
-                    color2 = colors[j + 1]
-                    break
-            else:  # Handle case where ratio might be exactly 1.0
-                stop1 = color_stops[-2]
-                stop2 = color_stops[-1]
-                color1 = colors[-2]
-                color2 = colors[-1]
-
-            # Interpolate between the two colors
-            local_ratio = (ratio - stop1) / (stop2 - stop1)
-            r = int(color1[0] * (1 - local_ratio) + color2[0] * local_ratio)
-            g = int(color1[1] * (1 - local_ratio) + color2[1] * local_ratio)
-            b = int(color1[2] * (1 - local_ratio) + color2[2] * local_ratio)
-
-            # Draw a line
-            draw.line((0, i, width, i), fill=(r, g, b))
-
-
 
-    img.save(filename)
+    # Top-to-bottom gradient through every color stop
+    save_gradient(filename, width, height, colors, "vertical")
     print(f"Wallpaper saved to {filename}")
 
 
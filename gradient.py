@@ -0,0 +1,268 @@
+
+from PIL import Image
+from collections import OrderedDict
+from colorspace import apply_lut
+from pngstream import write_png
+import numpy as np
+
+# Entries in a precomputed stop table (see gradient_lut)
+GRADIENT_LUT_SIZE = 4096
+
+# Streamed gradients are produced this many rows at a time, and gradients
+# of more than STREAM_PIXELS are streamed to disk by save_gradient rather
+# than built (and cached) whole
+GRADIENT_BAND_ROWS = 256
+STREAM_PIXELS = 7680 * 4320
+
+# Rendered gradients are kept in memory and reused until the cache holds
+# more than GRADIENT_CACHE_BYTES, then dropped least recently used first
+GRADIENT_CACHE_BYTES = 256 << 20
+
+# Default ramp for field_to_rgb: per.py's blue clouds, dark blue to near white
+CLOUD_RAMP = [(0, 0, 50), (255, 200, 255)]
+
+_gradient_cache = OrderedDict()
+
+def gradient_field(width, height, mode="vertical", row_start=0, row_stop=None, center=None, extent=None,
+                   angle=0.0):
+    """Gradient position t (0..1) for rows row_start..row_stop, as a broadcastable array
+
+    Linear modes only vary along one axis, so "vertical" gives an (H, 1)
+    column and "horizontal" a (1, W) row; the 2D modes give (H, W).
+
+    mode: "vertical" (t = y / extent, extent defaults to height),
+          "horizontal" (t = x / extent, extent defaults to width),
+          "diagonal" (t = (x + y) / extent, extent defaults to width + height - 2),
+          "radial" (distance from center over extent, which defaults to the
+          center-to-corner distance) or
+          "angular" (sweep around center, starting at angle radians).
+    center defaults to (width / 2, height / 2).
+    """
+    if row_stop is None:
+        row_stop = height
+
+    x = np.arange(width, dtype=np.float64)
+    y = np.arange(row_start, row_stop, dtype=np.float64)[:, None]
+
+    if mode == "vertical":
+        t = y / (height if extent is None else extent)
+    elif mode == "horizontal":
+        t = x[None, :] / (width if extent is None else extent)
+    elif mode == "diagonal":
+        t = (x + y) / (width + height - 2 if extent is None else extent)
+    elif mode in ("radial", "angular"):
+        cx, cy = (width / 2, height / 2) if center is None else center
+        dx, dy = x - cx, y - cy
+        if mode == "radial":
+            if extent is None:
+                extent = np.sqrt(cx ** 2 + cy ** 2)
+            t = np.sqrt(dx * dx + dy * dy) / extent
+        else:
+            t = np.mod((np.arctan2(dy, dx) - angle) / (2 * np.pi), 1.0)
+    else:
+        raise ValueError(f"Unknown gradient mode: {mode}")
+
+    return np.clip(t, 0.0, 1.0)
+
+def _channel_scale(dtype):
+    """Factor taking 0..255 colors to the range of dtype (0..1 for floats)"""
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.floating):
+        return 1 / 255
+    return np.iinfo(dtype).max / 255
+
+def stop_colors(t, colors, positions=None, dtype=np.uint8):
+    """Interpolate multi-stop RGB colors at every value of t, as (..., 3) of dtype
+
+    positions are the stop offsets (ascending, 0..1), evenly spaced by
+    default. Each pixel blends its two neighbouring stops as
+    c1 * (1 - f) + c2 * f and truncates, like the per-row loops this
+    replaces. uint16 output spans 0..65535 and float output 0..1, both
+    without going through 8 bits first.
+    """
+    colors = np.asarray(colors, dtype=np.float64)[:, :3] * _channel_scale(dtype)
+    t = np.asarray(t, dtype=np.float64)
+    if len(colors) == 1:
+        return np.broadcast_to(colors[0].astype(dtype), t.shape + (3,)).copy()
+
+    if positions is None:
+        positions = np.arange(len(colors)) / (len(colors) - 1)
+    positions = np.asarray(positions, dtype=np.float64)
+
+    t = np.clip(t, positions[0], positions[-1])
+    segment = np.clip(np.searchsorted(positions, t, side="right") - 1, 0, len(colors) - 2)
+    start = positions[segment]
+    local = (t - start) / (positions[segment + 1] - start)
+
+    out = np.empty(t.shape + (3,), dtype=dtype)
+    for channel in range(3):
+        c = colors[:, channel]
+        out[..., channel] = c[segment] * (1 - local) + c[segment + 1] * local
+    return out
+
+def gradient_lut(colors, positions=None, size=GRADIENT_LUT_SIZE, dtype=np.uint8):
+    """(size, 3) stop table for colorspace.apply_lut on arbitrary fields"""
+    return stop_colors(np.arange(size) / (size - 1), colors, positions, dtype)
+
+def gradient_array(width, height, colors, mode="vertical", positions=None, lut_size=GRADIENT_LUT_SIZE,
+                   dtype=np.uint8, row_start=0, row_stop=None, **field):
+    """(H, W, 3) multi-stop gradient of dtype; field options go to gradient_field
+
+    2D modes on frames of more than lut_size pixels are mapped through a
+    lut_size-entry stop table, which is within one level of exact; linear
+    gradients and small frames are interpolated directly. lut_size=None
+    always interpolates directly. row_start/row_stop render just those rows.
+    """
+    if row_stop is None:
+        row_stop = height
+
+    t = gradient_field(width, height, mode, row_start, row_stop, **field)
+    if lut_size is not None and mode not in ("vertical", "horizontal") and width * height > lut_size:
+        rgb = apply_lut(t, gradient_lut(colors, positions, lut_size, dtype))
+    else:
+        rgb = stop_colors(t, colors, positions, dtype)
+    return np.ascontiguousarray(np.broadcast_to(rgb, (row_stop - row_start, width, 3)))
+
+def gradient_bands(width, height, colors, mode="vertical", positions=None, lut_size=GRADIENT_LUT_SIZE,
+                   band_rows=GRADIENT_BAND_ROWS, **field):
+    """Yield the uint8 gradient band_rows rows at a time, top to bottom, for pngstream.write_png"""
+    for row_start in range(0, height, band_rows):
+        yield gradient_array(width, height, colors, mode, positions, lut_size,
+                             row_start=row_start, row_stop=min(row_start + band_rows, height), **field)
+
+def gradient_image(width, height, colors, mode="vertical", positions=None, lut_size=GRADIENT_LUT_SIZE, **field):
+    """gradient_array as a PIL RGB image"""
+    return Image.fromarray(gradient_array(width, height, colors, mode, positions, lut_size, **field), "RGB")
+
+def field_to_rgb(field, colors=CLOUD_RAMP, positions=None, vmin=None, vmax=None, out=None, lut_size=256):
+    """Color a scalar field (e.g. noise) through a multi-stop ramp in one vectorized pass
+
+    Values from vmin to vmax (the field's own min and max by default) run
+    over the ramp; the default 256-entry table quantizes exactly like
+    normalizing the field to 0..255 first. out may be a preallocated
+    (H, W, 3) uint8 buffer, which is filled in place and returned.
+    """
+    field = np.asarray(field)
+    if vmin is None:
+        vmin = field.min()
+    if vmax is None:
+        vmax = field.max()
+    return apply_lut(field, gradient_lut(colors, positions, lut_size), vmin, vmax, out=out)
+
+def _cache_key(width, height, colors, mode, positions, dtype, field):
+    colors = tuple(map(tuple, np.asarray(colors).tolist()))
+    if positions is not None:
+        positions = tuple(np.asarray(positions, dtype=np.float64).tolist())
+    return (width, height, colors, mode, positions, np.dtype(dtype).str, tuple(sorted(field.items())))
+
+def cached_gradient(width, height, colors, mode="vertical", positions=None, dtype=np.uint8,
+                    cache_bytes=GRADIENT_CACHE_BYTES, **field):
+    """gradient_array, rendered once per distinct set of arguments and shared afterwards
+
+    The returned array is read-only since every caller gets the same one;
+    copy it (or use cached_gradient_image) to draw on top.
+    """
+    key = _cache_key(width, height, colors, mode, positions, dtype, field)
+    rgb = _gradient_cache.get(key)
+    if rgb is not None:
+        _gradient_cache.move_to_end(key)
+        return rgb
+
+    rgb = gradient_array(width, height, colors, mode, positions, dtype=dtype, **field)
+    rgb.flags.writeable = False
+    _gradient_cache[key] = rgb
+    while _gradient_cache and sum(cached.nbytes for cached in _gradient_cache.values()) > cache_bytes:
+        _gradient_cache.popitem(last=False)
+    return rgb
+
+def cached_gradient_image(width, height, colors, mode="vertical", positions=None,
+                          cache_bytes=GRADIENT_CACHE_BYTES, **field):
+    """A fresh PIL image of a cached gradient, safe to draw on"""
+    rgb = cached_gradient(width, height, colors, mode, positions, cache_bytes=cache_bytes, **field)
+    return Image.fromarray(rgb, "RGB")
+
+def save_gradient(filename, width, height, colors, mode="vertical", positions=None, **field):
+    """Write a gradient to filename, streaming it band by band when it is too big to hold whole"""
+    if width * height > STREAM_PIXELS and filename.lower().endswith(".png"):
+        write_png(filename, gradient_bands(width, height, colors, mode, positions, **field), width, height)
+    else:
+        cached_gradient_image(width, height, colors, mode, positions, **field).save(filename)
+
+def clear_gradient_cache():
+    """Drop every cached gradient"""
+    _gradient_cache.clear()
+
+def _mesh_weights(size, points, method):
+    """(size, points) matrix spreading `points` evenly spaced controls over `size` pixels"""
+    weights = np.zeros((size, points))
+    if points == 1:
+        weights[:] = 1.0
+        return weights
+
+    u = np.arange(size) * (points - 1) / max(size - 1, 1)
+    i = np.minimum(np.floor(u).astype(np.intp), points - 2)
+    f = u - i
+    rows = np.arange(size)
+    if method == "bilinear":
+        taps = [(i, 1 - f), (i + 1, f)]
+    elif method == "bicubic":
+        # Catmull-Rom, repeating the edge controls past the border
+        f2, f3 = f * f, f * f * f
+        taps = [
+            (i - 1, (-f3 + 2 * f2 - f) / 2),
+            (i, (3 * f3 - 5 * f2 + 2) / 2),
+            (i + 1, (-3 * f3 + 4 * f2 + f) / 2),
+            (i + 2, (f3 - f2) / 2),
+        ]
+    else:
+        raise ValueError(f"Unknown mesh interpolation: {method}")
+
+    for index, weight in taps:
+        np.add.at(weights, (rows, np.clip(index, 0, points - 1)), weight)
+    return weights
+
+def mesh_gradient_array(width, height, grid, method="bicubic", dtype=np.uint8):
+    """(H, W, 3) gradient through a (rows, cols, 3) grid of control colors
+
+    The controls sit evenly spaced from corner to corner. Interpolation
+    is separable, so the whole frame is two matrix products: columns
+    first (rows x W), then rows. Bicubic can overshoot the control colors
+    and is clipped to the valid range.
+    """
+    grid = np.asarray(grid, dtype=np.float64)[..., :3] * _channel_scale(dtype)
+    rows, cols = grid.shape[:2]
+    across = np.einsum("wc,rcz->rwz", _mesh_weights(width, cols, method), grid)
+    rgb = np.tensordot(_mesh_weights(height, rows, method), across, axes=(1, 0))
+
+    top = 1.0 if np.issubdtype(np.dtype(dtype), np.floating) else np.iinfo(dtype).max
+    return np.clip(rgb, 0, top, out=rgb).astype(dtype)
+
+def mesh_gradient_image(width, height, grid, method="bicubic"):
+    """mesh_gradient_array as a PIL RGB image"""
+    return Image.fromarray(mesh_gradient_array(width, height, grid, method), "RGB")
+
+def profile_array(width, height, channels, axis="vertical"):
+    """(H, W, 3) uint8 background whose color only depends on the row (or column)
+
+    channels holds one entry per RGB channel: a function called once with
+    the float64 array of row indices (column indices for axis="horizontal")
+    that returns the channel's 0..255 values as a NumPy expression, or a
+    constant. Values are truncated like int() and the 1D result is
+    broadcast across the frame.
+    """
+    if axis not in ("vertical", "horizontal"):
+        raise ValueError(f"Unknown profile axis: {axis}")
+    length = height if axis == "vertical" else width
+    i = np.arange(length, dtype=np.float64)
+
+    values = np.empty((length, 3))
+    for channel, profile in enumerate(channels):
+        values[:, channel] = profile(i) if callable(profile) else profile
+    rgb = np.clip(np.trunc(values), 0, 255).astype(np.uint8)
+
+    rgb = rgb[:, np.newaxis] if axis == "vertical" else rgb[np.newaxis]
+    return np.ascontiguousarray(np.broadcast_to(rgb, (height, width, 3)))
+
+def profile_image(width, height, channels, axis="vertical"):
+    """profile_array as a PIL RGB image"""
+    return Image.fromarray(profile_array(width, height, channels, axis), "RGB")
@@ -1,19 +1,23 @@
 
 from PIL import Image, ImageDraw
+from indexed import MAX_PALETTE_COLORS, indexed_image
+from tiling import tile_array, wrap_positions
+import numpy as np
 import math
 
 # Set the dimensions for a mobile wallpaper (1080x1920)
 WIDTH, HEIGHT = 1080, 1920
 
-# Create a new image with a dark background
-image = Image.new("RGB", (WIDTH, HEIGHT), "#1C2526")
-draw = ImageDraw.Draw(image)
-
 # Hexagon parameters
 HEX_SIZE = 50  # Radius of each hexagon (distance from center to vertex)
 HEX_SPACING = HEX_SIZE * 1.5  # Vertical spacing between hexagons
 HEX_WIDTH = HEX_SIZE * math.sqrt(3)  # Width of a hexagon (side to side)
 
+# Render one seamless tile of two hexagon rows, TILE_COLUMNS across, and
+# repeat it over the frame instead of drawing every hexagon
+TILEABLE = False
+TILE_COLUMNS = 12
+
 # Function to generate a gradient color based on position
 def get_gradient_color(x, y):
     # Gradient from blue (#118AB2) to coral (#FF6F61) based on y-position
@@ -25,28 +29,83 @@ def get_gradient_color(x, y):
     b = int(start_color[2] + (end_color[2] - start_color[2]) * t)
     return (r, g, b)
 
-# Function to draw a hexagon at (center_x, center_y)
-def draw_hexagon(draw, center_x, center_y, size, color):
+# Vertices of a hexagon centered at (center_x, center_y)
+def hexagon_points(center_x, center_y, size):
     points = []
     for i in range(6):
         angle = math.pi / 3 * i  # 60 degrees in radians
         x = center_x + size * math.cos(angle)
         y = center_y + size * math.sin(angle)
         points.append((x, y))
-    draw.polygon(points, fill=color, outline="#FFFFFF")
-
-# Draw a hexagonal grid
-for row in range(-1, int(HEIGHT / HEX_SPACING) + 1):
-    for col in range(-1, int(WIDTH / HEX_WIDTH) + 1):
-        # Calculate center of hexagon
-        x = col * HEX_WIDTH
-        y = row * HEX_SPACING
-        if row % 2 == 1:  # Offset every other row for honeycomb pattern
-            x += HEX_WIDTH / 2
-        # Ensure hexagon is within bounds
-        if 0 <= x <= WIDTH and 0 <= y <= HEIGHT:
-            color = get_gradient_color(x, y)
-            draw_hexagon(draw, x, y, HEX_SIZE, color)
+    return points
+
+# Function to draw a hexagon at (center_x, center_y)
+def draw_hexagon(draw, center_x, center_y, size, color):
+    draw.polygon(hexagon_points(center_x, center_y, size), fill=color, outline="#FFFFFF")
+
+# Seamless tile of two hexagon rows. Each pixel holds 1 + the row (counted
+# from the tile's top edge) of the hexagon covering it, OUTLINE on outlines
+# or 0 on the background; the column spacing is stretched slightly so the
+# tile is whole pixels wide
+OUTLINE = 255
+
+def hexagon_tile(columns=TILE_COLUMNS):
+    tile_width = round(columns * HEX_WIDTH)
+    tile_height = round(2 * HEX_SPACING)
+    spacing = tile_width / columns
+
+    hexagons = []
+    for row in range(2):
+        for col in range(columns):
+            x = col * spacing + (spacing / 2 if row % 2 == 1 else 0)
+            hexagons += wrap_positions(x, row * HEX_SPACING, HEX_SIZE, tile_width, tile_height)
+
+    # Same row-major drawing order as the full grid, so overlapping
+    # hexagons stack the same way on both sides of a seam
+    tile = Image.new("L", (tile_width, tile_height), 0)
+    tile_draw = ImageDraw.Draw(tile)
+    for x, y in sorted(hexagons, key=lambda center: (center[1], center[0])):
+        tile_draw.polygon(hexagon_points(x, y, HEX_SIZE), fill=1 + round(y / HEX_SPACING), outline=OUTLINE)
+    return np.asarray(tile)
+
+# The honeycomb as one repeated hexagon_tile, colored per hexagon row
+def tiled_hexagons(width, height, columns=TILE_COLUMNS):
+    tile = hexagon_tile(columns)
+    labels = tile_array(tile, width, height).astype(np.intp)
+    rows = 2 * (np.arange(height)[:, np.newaxis] // tile.shape[0]) + labels - 1
+
+    last_row = 2 * (height // tile.shape[0]) + 2
+    palette = [get_gradient_color(0, min(row * HEX_SPACING, HEIGHT)) for row in range(last_row + 1)]
+    palette = np.array(palette + [(255, 255, 255), (28, 37, 38)], dtype=np.uint8)  # outline, background
+    rows[labels == OUTLINE] = -2
+    rows[labels == 0] = -1
+    if len(palette) > MAX_PALETTE_COLORS:
+        return Image.fromarray(palette[rows], "RGB")
+    image = Image.fromarray((rows % len(palette)).astype(np.uint8), "P")
+    image.putpalette(palette.tobytes())
+    return image
+
+if TILEABLE:
+    image = tiled_hexagons(WIDTH, HEIGHT)
+else:
+    # Create a new image with a dark background, on a palette of the row colors
+    rows = range(-1, int(HEIGHT / HEX_SPACING) + 1)
+    row_colors = [get_gradient_color(0, row * HEX_SPACING) for row in rows]
+    image = indexed_image(WIDTH, HEIGHT, "#1C2526", row_colors + ["#FFFFFF"])
+    draw = ImageDraw.Draw(image)
+
+    # Draw a hexagonal grid
+    for row in rows:
+        for col in range(-1, int(WIDTH / HEX_WIDTH) + 1):
+            # Calculate center of hexagon
+            x = col * HEX_WIDTH
+            y = row * HEX_SPACING
+            if row % 2 == 1:  # Offset every other row for honeycomb pattern
+                x += HEX_WIDTH / 2
+            # Ensure hexagon is within bounds
+            if 0 <= x <= WIDTH and 0 <= y <= HEIGHT:
+                color = get_gradient_color(x, y)
+                draw_hexagon(draw, x, y, HEX_SIZE, color)
 
 # Save the image
 image.save("hexagonal_wallpaper.png")
@@ -0,0 +1,36 @@
+
+from PIL import Image, ImageColor, ImageDraw
+
+# Designs drawn in at most this many distinct colors (background included)
+# are rendered on a palette ("P") image: one byte a pixel instead of three,
+# and PNGs that are smaller and quicker to encode. Anything more colorful
+# falls back to RGB.
+MAX_PALETTE_COLORS = 256
+
+def indexed_image(width, height, background, colors=(), max_colors=MAX_PALETTE_COLORS):
+    """Blank image to draw colors on: "P" mode if they fit one palette, "RGB" otherwise
+
+    colors are every color that will be drawn (RGB tuples or color
+    strings; repeats and an over-estimate are fine). ImageDraw adds each
+    one to the palette the first time it is used, so drawing code is the
+    same for both modes, and a P image converts to exactly the RGB one.
+    """
+    distinct = {ImageColor.getrgb(color)[:3] if isinstance(color, str) else tuple(color[:3])
+                for color in [background, *colors]}
+    mode = "P" if len(distinct) <= max_colors else "RGB"
+    return Image.new(mode, (width, height), background)
+
+def shape_colors(shapes):
+    """Every fill and outline color used by a list of shapes (see draw_shapes)"""
+    return [options[key] for _, _, options in shapes for key in ("fill", "outline") if options.get(key) is not None]
+
+def draw_shapes(draw, shapes):
+    """Draw (method, xy, options) shapes in order, e.g. ("ellipse", box, {"fill": color})"""
+    for method, xy, options in shapes:
+        getattr(draw, method)(xy, **options)
+
+def render_shapes(width, height, background, shapes, max_colors=MAX_PALETTE_COLORS):
+    """Image of shapes drawn over background, on a palette when their colors allow"""
+    image = indexed_image(width, height, background, shape_colors(shapes), max_colors)
+    draw_shapes(ImageDraw.Draw(image), shapes)
+    return image
@@ -1,16 +1,22 @@
 
 from PIL import Image, ImageDraw
+from colorspace import hsv_to_rgb8
+from devices import DEVICE_MASTER, DEVICE_SIZES, save_device_variants
+from filecache import atomic_file, evict_lru
+from pngstream import write_apng, write_png
+from collections import deque
+from functools import partial
+from multiprocessing import Pool, shared_memory
 import numpy as np
-import colorsys
+from decimal import Decimal, localcontext
+import hashlib
+import math
 import os
 
 # Mobile resolution
 WIDTH, HEIGHT = 1080, 1920
 MAX_ITER = 300
 
-# Create output directory
-os.makedirs("julia_wallpapers", exist_ok=True)
-
 # Generate 10 different Julia sets with varying constants
 constants = [
     complex(-0.7, 0.27015),
@@ -25,33 +31,837 @@ constants = [
     complex(0.3, 0.5),
 ]
 
-def generate_julia(c, filename):
-    img = Image.new("RGB", (WIDTH, HEIGHT))
-    pixels = img.load()
+# Escape-time buffers are cached here, next to the PNGs
+BUFFER_DIR = "julia_wallpapers"
+
+# Exploration tile pyramid: level 0 is one TILE_SIZE tile spanning
+# TILE_WORLD x TILE_WORLD around the origin, each level halves the tile
+# side, and cached tiles are evicted least recently used first once the
+# cache holds more than TILE_CACHE_BYTES
+TILE_DIR = "tile_cache"
+TILE_SIZE = 256
+TILE_WORLD = 8.0
+TILE_CACHE_BYTES = 1 << 30
+
+# Rows per tile handed to a worker; small tiles keep the pool evenly loaded
+TILE_ROWS = 16
+
+# Subdivision starts from tiles of SUBDIVIDE_START pixels, and rectangles
+# SUBDIVIDE_MIN across are iterated pixel by pixel instead of split further
+SUBDIVIDE_START = 64
+SUBDIVIDE_MIN = 8
+
+# Adaptive budgets: every ADAPTIVE_TILE square starts at ADAPTIVE_START
+# iterations and doubles its cap until a doubling lets fewer than
+# ADAPTIVE_TOLERANCE of its pixels escape
+ADAPTIVE_TILE = 64
+ADAPTIVE_START = 64
+ADAPTIVE_TOLERANCE = 1e-3
+
+# Neighbouring counts this far apart mark a pixel for supersampling, and
+# at most SUPERSAMPLE_BATCH subsamples are iterated at a time
+EDGE_THRESHOLD = 2
+SUPERSAMPLE_BATCH = 1 << 20
+
+# Deep zoom: a perturbed pixel is glitched once |z| drops below
+# GLITCH_TOLERANCE * |Z| of the reference orbit, and glitched pixels are
+# re-rendered against at most MAX_REFERENCES further reference orbits
+GLITCH_TOLERANCE = 1e-3
+MAX_REFERENCES = 32
+
+# Streamed renders are iterated and written BAND_ROWS rows at a time, with
+# at most two bands per worker in flight
+BAND_ROWS = 64
+
+# Animation frames are iterated in stacked batches sized so that roughly
+# ANIMATION_BYTES_PER_PIXEL * pixels stays under ANIMATION_MEMORY
+ANIMATION_MEMORY = 1 << 30
+ANIMATION_BYTES_PER_PIXEL = 96
+
+def pixel_to_plane(x, y, width=WIDTH, height=HEIGHT, center=0j, zoom=1.0):
+    """Complex-plane point for (possibly fractional) pixel coordinates x, y"""
+    zx = center.real + (3.0 / zoom) * (x - width / 2) / (width / 2)
+    zy = center.imag + (2.0 / zoom) * (y - height / 2) / (height / 2)
+    return zx + 1j * zy
+
+def julia_grid(width=WIDTH, height=HEIGHT, row_start=0, row_stop=None, center=0j, zoom=1.0):
+    """Starting points z0 for rows row_start..row_stop of the frame, complex128
+
+    The view spans +-3/zoom horizontally and +-2/zoom vertically around center.
+    """
+    if row_stop is None:
+        row_stop = height
+
+    # Same expressions as the per-pixel version so the floats match exactly
+    x = np.arange(width)[np.newaxis, :]
+    y = np.arange(row_start, row_stop)[:, np.newaxis]
+    return pixel_to_plane(x, y, width, height, center, zoom)
+
+def escape_time(z, c, max_iter=MAX_ITER, periodicity=True, smooth=False):
+    """Iteration count at which each point of z leaves |z| < 4 (max_iter if it never does)
+
+    With smooth=True a float32 array of continuous (normalized) iteration
+    counts n + 1 - log2(log|z_n|) is returned as well; interior points get
+    max_iter. c may also be an array broadcastable against z, e.g. one
+    constant per frame of a (frames, H, W) stack.
+    """
+    counts = np.full(z.shape, max_iter, dtype=np.int32)
+    flat_counts = counts.reshape(-1)
+    if smooth:
+        smooth_counts = np.full(z.shape, max_iter, dtype=np.float32)
+        flat_smooth = smooth_counts.reshape(-1)
+
+    # Only the points that are still bounded are kept and iterated. Real and
+    # imaginary parts are updated separately with the same operations as
+    # Python's complex type, so chaotic points escape at the same iteration.
+    index = np.arange(z.size)
+    zr = z.real.reshape(-1).copy()
+    zi = z.imag.reshape(-1).copy()
+
+    per_point_c = np.ndim(c) > 0
+    if per_point_c:
+        cr = np.broadcast_to(np.real(c), z.shape).reshape(-1).copy()
+        ci = np.broadcast_to(np.imag(c), z.shape).reshape(-1).copy()
+    else:
+        cr, ci = c.real, c.imag
+
+    # Periodicity check (Brent): z is saved at iterations 1, 2, 4, 8, ... and a
+    # point whose orbit lands exactly on its saved value is on a cycle, so it
+    # can never escape and is dropped with max_iter straight away
+    saved_r = saved_i = None
+    next_save = 1
+
+    for iteration in range(max_iter):
+        modulus = np.hypot(zr, zi)
+        active = modulus < 4
+        escaped = ~active
+        if saved_r is not None:
+            active &= (zr != saved_r) | (zi != saved_i)
+        if not active.all():
+            flat_counts[index[escaped]] = iteration
+            if smooth:
+                flat_smooth[index[escaped]] = iteration + 1 - np.log2(np.log(modulus[escaped]))
+            index = index[active]
+            zr = zr[active]
+            zi = zi[active]
+            if saved_r is not None:
+                saved_r = saved_r[active]
+                saved_i = saved_i[active]
+            if per_point_c:
+                cr = cr[active]
+                ci = ci[active]
+            if index.size == 0:
+                break
+        if periodicity and iteration == next_save:
+            saved_r, saved_i = zr.copy(), zi.copy()
+            next_save *= 2
+        zr, zi = zr * zr - zi * zi + cr, zr * zi + zi * zr + ci
+
+    if smooth:
+        return counts, smooth_counts
+    return counts
+
+def escape_time_adaptive(z, c, max_iter=MAX_ITER, start_iter=ADAPTIVE_START, tile=ADAPTIVE_TILE,
+                         tolerance=ADAPTIVE_TOLERANCE, return_caps=False):
+    """escape_time with a per-tile iteration cap that only grows where it still adds detail
+
+    All tiles start with a cap of start_iter. Each round doubles the cap of
+    the tiles still open and iterates their unescaped pixels up to it; a tile
+    closes once a round lets at most tolerance of its pixels escape, or when
+    it has none left. Pixels still bounded in a closed tile are treated as
+    interior (max_iter). Escaped pixels get exactly the counts escape_time
+    gives; only pixels that would have escaped after their tile closed
+    differ from a global max_iter render. With return_caps=True the final
+    cap of every tile is returned too.
+    """
+    height, width = z.shape
+    tiles_x = -(-width // tile)
+    tiles_y = -(-height // tile)
+    tile_ids = ((np.arange(height) // tile)[:, np.newaxis] * tiles_x + np.arange(width) // tile).reshape(-1)
+    tile_pixels = np.bincount(tile_ids, minlength=tiles_x * tiles_y)
+    caps = np.zeros(tiles_x * tiles_y, dtype=np.int32)
+
+    counts = np.full(z.shape, max_iter, dtype=np.int32)
+    flat_counts = counts.reshape(-1)
+    index = np.arange(z.size)
+    zr = z.real.reshape(-1).copy()
+    zi = z.imag.reshape(-1).copy()
+
+    iteration = 0
+    stop = min(start_iter, max_iter)
+    open_tiles = np.ones(tiles_x * tiles_y, dtype=bool)
+    while index.size:
+        escaped_before = np.bincount(tile_ids[index], minlength=len(caps))
+        for iteration in range(iteration, stop):
+            active = np.hypot(zr, zi) < 4
+            if not active.all():
+                flat_counts[index[~active]] = iteration
+                index = index[active]
+                zr = zr[active]
+                zi = zi[active]
+                if index.size == 0:
+                    break
+            zr, zi = zr * zr - zi * zi + c.real, zr * zi + zi * zr + c.imag
+        else:
+            iteration = stop
+
+            # One last escape check, so pixels that escaped on the final step count
+            active = np.hypot(zr, zi) < 4
+            if not active.all():
+                flat_counts[index[~active]] = iteration
+                index, zr, zi = index[active], zr[active], zi[active]
+
+        caps[open_tiles] = stop
+        remaining = np.bincount(tile_ids[index], minlength=len(caps))
+        escaped = escaped_before - remaining
+        open_tiles &= (remaining > 0) & (escaped > tolerance * tile_pixels)
+        if stop >= max_iter or not open_tiles.any():
+            break
+
+        # Pixels of closed tiles stay at max_iter; the rest carry on
+        keep = open_tiles[tile_ids[index]]
+        index, zr, zi = index[keep], zr[keep], zi[keep]
+        stop = min(stop * 2, max_iter)
+
+    if return_caps:
+        return counts, caps.reshape(tiles_y, tiles_x)
+    return counts
+
+def _ranges(starts, lengths):
+    """Concatenation of arange(s, s + n) for every start s and length n"""
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+
+def escape_time_subdivided(z, c, max_iter=MAX_ITER, min_size=SUBDIVIDE_MIN, start_size=SUBDIVIDE_START):
+    """escape_time via Mariani-Silver subdivision
+
+    A rectangle whose whole outline has the same iteration count is filled
+    with that count without iterating its inside; otherwise it is split in
+    four (children share the split lines) until it is min_size across, at
+    which point its inside is iterated directly. Like any boundary-tracing
+    renderer this can miss features that sit entirely inside a uniform
+    outline.
+    """
+    height, width = z.shape
+    counts = np.full(z.shape, -1, dtype=np.int32)
+    flat_counts = counts.reshape(-1)
+    flat_z = z.reshape(-1)
+
+    # The frame outline is usually uniform exterior, so start from a grid of
+    # start_size tiles rather than the whole frame. Rectangles are
+    # (y0, x0, y1, x1), end-exclusive, and neighbours share their edges.
+    rects = [
+        (y0, x0, min(y0 + start_size + 1, height), min(x0 + start_size + 1, width))
+        for y0 in range(0, max(height - 1, 1), start_size)
+        for x0 in range(0, max(width - 1, 1), start_size)
+    ]
+    while rects:
+        y0, x0, y1, x1 = np.array(rects).T
+        w, h = x1 - x0, y1 - y0
+        rows = _ranges(y0, h) * width
+        edges = [
+            (np.repeat(y0 * width, w) + _ranges(x0, w), w),
+            (np.repeat((y1 - 1) * width, w) + _ranges(x0, w), w),
+            (rows + np.repeat(x0, h), h),
+            (rows + np.repeat(x1 - 1, h), h),
+        ]
+
+        # Iterate every outline pixel of this level in one batch
+        todo = np.unique(np.concatenate([edge for edge, _ in edges]))
+        todo = todo[flat_counts[todo] < 0]
+        flat_counts[todo] = escape_time(flat_z[todo], c, max_iter)
+
+        lo = np.full(len(rects), max_iter)
+        hi = np.zeros(len(rects), dtype=np.int32)
+        for edge, lengths in edges:
+            starts = np.cumsum(lengths) - lengths
+            lo = np.minimum(lo, np.minimum.reduceat(flat_counts[edge], starts))
+            hi = np.maximum(hi, np.maximum.reduceat(flat_counts[edge], starts))
+
+        next_rects = []
+        leftovers = []
+        for (y0, x0, y1, x1), uniform, value in zip(rects, lo == hi, lo):
+            if uniform:
+                counts[y0 + 1:y1 - 1, x0 + 1:x1 - 1] = value
+            elif y1 - y0 <= min_size or x1 - x0 <= min_size:
+                leftovers.append((np.arange(y0 + 1, y1 - 1)[:, np.newaxis] * width + np.arange(x0 + 1, x1 - 1)).reshape(-1))
+            else:
+                ym, xm = (y0 + y1) // 2, (x0 + x1) // 2
+                next_rects += [(y0, x0, ym + 1, xm + 1), (y0, xm, ym + 1, x1),
+                               (ym, x0, y1, xm + 1), (ym, xm, y1, x1)]
+
+        if leftovers:
+            inside = np.concatenate(leftovers)
+            flat_counts[inside] = escape_time(flat_z[inside], c, max_iter)
+        rects = next_rects
+
+    return counts
+
+def julia_palette(max_iter=MAX_ITER):
+    """RGB lookup table with one row per possible iteration count"""
+    iteration = np.arange(max_iter + 1)
+    hue = np.trunc(255 * iteration / max_iter)
+    saturation = 255
+    value = np.where(iteration < max_iter, 255, 0)
+
+    return hsv_to_rgb8(hue / 255.0, saturation / 255.0, value / 255.0)
+
+def colorize(counts, max_iter=MAX_ITER):
+    """Map an iteration count array to an (H, W, 3) uint8 RGB array"""
+    return julia_palette(max_iter)[counts]
+
+def symmetric_rows(height, center=0j):
+    """Number of top rows that determine the whole frame, or None if the view isn't centered
+
+    Julia sets are symmetric under z -> -z, and on a view centered on the
+    origin pixel (x, y) maps exactly onto pixel (width - x, height - y).
+    """
+    if center != 0:
+        return None
+    return height // 2 + 1
+
+def _mirror_lower_half(counts, c, max_iter=MAX_ITER, zoom=1.0, smooth=None):
+    """Fill the rows below symmetric_rows() by a 180 degree flip of the top half"""
+    height, width = counts.shape
+    rows = symmetric_rows(height)
+    counts[rows:, 1:] = counts[height - rows:0:-1, width - 1:0:-1]
+
+    # Column 0 sits at -3/zoom, whose mirror image is just outside the frame
+    z = julia_grid(width, height, rows, height, zoom=zoom)[:, :1]
+    if smooth is None:
+        counts[rows:, :1] = escape_time(z, c, max_iter)
+    else:
+        smooth[rows:, 1:] = smooth[height - rows:0:-1, width - 1:0:-1]
+        counts[rows:, :1], smooth[rows:, :1] = escape_time(z, c, max_iter, smooth=True)
+
+def _check_engine(subdivide, smooth, adaptive=False):
+    if subdivide and smooth:
+        raise ValueError("Smooth counts need every pixel iterated; use subdivide=False")
+    if adaptive and (subdivide or smooth):
+        raise ValueError("Adaptive budgets work on plain counts only; drop subdivide/smooth")
+
+def render_counts(c, width=WIDTH, height=HEIGHT, max_iter=MAX_ITER, center=0j, zoom=1.0, symmetric=True,
+                  subdivide=False, smooth=False, adaptive=False):
+    """Iteration counts for one frame, iterating only the top half when the view allows it
+
+    With smooth=True a (counts, smooth_counts) pair is returned. With
+    adaptive=True max_iter is only spent where it changes the image (see
+    escape_time_adaptive).
+    """
+    _check_engine(subdivide, smooth, adaptive)
+    if subdivide:
+        engine = escape_time_subdivided
+    elif adaptive:
+        engine = escape_time_adaptive
+    else:
+        engine = partial(escape_time, smooth=smooth)
+
+    rows = symmetric_rows(height, center) if symmetric else None
+    if rows is None:
+        return engine(julia_grid(width, height, center=center, zoom=zoom), c, max_iter)
+
+    z = julia_grid(width, height, 0, rows, zoom=zoom)
+    counts = np.empty((height, width), dtype=np.int32)
+    if not smooth:
+        counts[:rows] = engine(z, c, max_iter)
+        _mirror_lower_half(counts, c, max_iter, zoom)
+        return counts
+
+    smooth_counts = np.empty((height, width), dtype=np.float32)
+    counts[:rows], smooth_counts[:rows] = engine(z, c, max_iter)
+    _mirror_lower_half(counts, c, max_iter, zoom, smooth_counts)
+    return counts, smooth_counts
+
+def _shared_views(buf, width, height, smooth):
+    """Counts (and smooth counts, stored right after them) laid over a shared buffer"""
+    counts = np.ndarray((height, width), dtype=np.int32, buffer=buf)
+    if not smooth:
+        return counts, None
+    return counts, np.ndarray((height, width), dtype=np.float32, buffer=buf, offset=counts.nbytes)
+
+def _render_tile(task):
+    """Pool worker: iterate one row tile and write its counts into shared memory"""
+    name, width, height, c, max_iter, center, zoom, subdivide, smooth, row_start, row_stop = task
+
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        counts, smooth_counts = _shared_views(shm.buf, width, height, smooth)
+        z = julia_grid(width, height, row_start, row_stop, center, zoom)
+        if subdivide:
+            counts[row_start:row_stop] = escape_time_subdivided(z, c, max_iter)
+        elif smooth:
+            counts[row_start:row_stop], smooth_counts[row_start:row_stop] = escape_time(z, c, max_iter, smooth=True)
+        else:
+            counts[row_start:row_stop] = escape_time(z, c, max_iter)
+        del counts, smooth_counts
+    finally:
+        shm.close()
+
+def escape_time_tiled(cs, width=WIDTH, height=HEIGHT, max_iter=MAX_ITER, workers=None, tile_rows=TILE_ROWS,
+                      center=0j, zoom=1.0, symmetric=True, subdivide=False, smooth=False):
+    """Iteration counts for each constant in cs, rendered as row tiles on a process pool
+
+    With smooth=True each entry of the result is a (counts, smooth_counts) pair.
+    """
+    _check_engine(subdivide, smooth)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Centered views only need tiles for the top half
+    rows = symmetric_rows(height, center) if symmetric else None
+    tiled_rows = height if rows is None else rows
+
+    size = width * height * (8 if smooth else 4)
+    buffers = [shared_memory.SharedMemory(create=True, size=size) for _ in cs]
+    try:
+        tasks = [
+            (shm.name, width, height, c, max_iter, center, zoom, subdivide, smooth,
+             row_start, min(row_start + tile_rows, tiled_rows))
+            for shm, c in zip(buffers, cs)
+            for row_start in range(0, tiled_rows, tile_rows)
+        ]
+
+        # Tiles near the set boundary cost far more than exterior ones, so
+        # they are handed out one at a time as workers free up
+        if workers == 1:
+            for task in tasks:
+                _render_tile(task)
+        else:
+            with Pool(workers) as pool:
+                for _ in pool.imap_unordered(_render_tile, tasks, chunksize=1):
+                    pass
+
+        results = []
+        for shm, c in zip(buffers, cs):
+            counts, smooth_counts = _shared_views(shm.buf, width, height, smooth)
+            counts = counts.copy()
+            if smooth:
+                smooth_counts = smooth_counts.copy()
+            if rows is not None:
+                _mirror_lower_half(counts, c, max_iter, zoom, smooth_counts)
+            results.append((counts, smooth_counts) if smooth else counts)
+        return results
+    finally:
+        for shm in buffers:
+            shm.close()
+            shm.unlink()
+
+def edge_mask(counts, threshold=EDGE_THRESHOLD):
+    """Pixels whose count differs from one of their 4 neighbours by threshold or more"""
+    counts = np.asarray(counts, dtype=np.int32)
+    mask = np.zeros(counts.shape, dtype=bool)
+
+    dy = np.abs(np.diff(counts, axis=0)) >= threshold
+    dx = np.abs(np.diff(counts, axis=1)) >= threshold
+    mask[1:] |= dy
+    mask[:-1] |= dy
+    mask[:, 1:] |= dx
+    mask[:, :-1] |= dx
+    return mask
 
-    for x in range(WIDTH):
-        for y in range(HEIGHT):
-            zx = 3.0 * (x - WIDTH / 2) / (WIDTH / 2)
-            zy = 2.0 * (y - HEIGHT / 2) / (HEIGHT / 2)
-            z = complex(zx, zy)
+def supersample_edges(counts, c, samples=4, max_iter=MAX_ITER, center=0j, zoom=1.0, threshold=EDGE_THRESHOLD,
+                      palette=None, symmetric=True):
+    """Anti-aliased RGB frame: one sample per pixel, samples x samples on edge pixels only
 
-            iteration = 0
-            while abs(z) < 4 and iteration < MAX_ITER:
-                z = z * z + c
-                iteration += 1
+    counts is the frame's ordinary one-sample render; only pixels picked out
+    by edge_mask are iterated again, and their subsample colors averaged.
+    Edge pixels sit next to the set and carry most of the iteration work, so
+    the cost grows with samples ** 2 times that share rather than the pixel
+    count; centered views supersample the top half only.
+    """
+    if palette is None:
+        palette = julia_palette(max_iter)
+    height, width = counts.shape
+    rgb = palette[counts]
 
-            hue = int(255 * iteration / MAX_ITER)
-            saturation = 255
-            value = 255 if iteration < MAX_ITER else 0
+    mask = edge_mask(counts, threshold)
+    rows = symmetric_rows(height, center) if symmetric else None
+    if rows is not None:
+        mask[rows:, 1:] = False
+    ys, xs = np.nonzero(mask)
+    offsets = (np.arange(samples) + 0.5) / samples - 0.5
+    batch = max(1, SUPERSAMPLE_BATCH // samples ** 2)
+    for start in range(0, len(ys), batch):
+        y = ys[start:start + batch]
+        x = xs[start:start + batch]
 
-            r, g, b = [int(x * 255) for x in colorsys.hsv_to_rgb(hue / 255.0, saturation / 255.0, value / 255.0)]
-            pixels[x, y] = (r, g, b)
+        # (pixels, samples, samples) grid of subpixel points
+        z = pixel_to_plane(x[:, np.newaxis, np.newaxis] + offsets[np.newaxis, np.newaxis, :],
+                           y[:, np.newaxis, np.newaxis] + offsets[np.newaxis, :, np.newaxis],
+                           width, height, center, zoom)
+        colors = palette[escape_time(z, c, max_iter)].mean(axis=(1, 2))
+        rgb[y, x] = np.rint(colors).astype(np.uint8)
 
+    # The subsample pattern is symmetric too, so the bottom half is a flip
+    if rows is not None:
+        rgb[rows:, 1:] = rgb[height - rows:0:-1, width - 1:0:-1]
+    return rgb
+
+def _to_decimal(value):
+    """Exact Decimal for a float, int, str or Decimal coordinate"""
+    return value if isinstance(value, Decimal) else Decimal(value)
+
+def reference_orbit(z0, c, max_iter=MAX_ITER, digits=50):
+    """Orbit Z_0..Z_n of one point computed in high precision, rounded to complex128
+
+    z0 is a (real, imag) pair of anything Decimal accepts, so a deep-zoom
+    center can be given as strings with as many digits as needed. The orbit
+    stops at the first |Z_n| >= 4 or after max_iter steps.
+    """
+    re, im = _to_decimal(z0[0]), _to_decimal(z0[1])
+    c_re, c_im = Decimal(c.real), Decimal(c.imag)
+
+    orbit = []
+    with localcontext() as ctx:
+        ctx.prec = digits
+        re, im = +re, +im
+        for _ in range(max_iter + 1):
+            point = complex(float(re), float(im))
+            orbit.append(point)
+            if abs(point) >= 4:
+                break
+            re, im = re * re - im * im + c_re, 2 * re * im + c_im
+    return np.array(orbit, dtype=np.complex128)
+
+def escape_time_perturbed(delta, orbit, max_iter=MAX_ITER, glitch_tolerance=GLITCH_TOLERANCE):
+    """Escape counts of the points Z_0 + delta, iterated as float64 offsets from a reference orbit
+
+    With z_n = Z_n + d_n the offsets follow d_{n+1} = 2 Z_n d_n + d_n^2, which
+    stays accurate in double precision long after z_n itself would not.
+    Returns (counts, glitched): glitched points got too close to the
+    reference (or outlived it) and need another reference orbit.
+    """
+    counts = np.full(delta.shape, max_iter, dtype=np.int32)
+    glitched = np.zeros(delta.shape, dtype=bool)
+    flat_counts = counts.reshape(-1)
+    flat_glitched = glitched.reshape(-1)
+
+    index = np.arange(delta.size)
+    dr = delta.real.reshape(-1).copy()
+    di = delta.imag.reshape(-1).copy()
+    for iteration in range(max_iter):
+        if iteration >= len(orbit):
+            flat_glitched[index] = True
+            break
+
+        ref_r, ref_i = orbit[iteration].real, orbit[iteration].imag
+        modulus = np.hypot(ref_r + dr, ref_i + di)
+        escaped = modulus >= 4
+        glitch = ~escaped & (modulus < glitch_tolerance * abs(orbit[iteration]))
+        active = ~(escaped | glitch)
+        if not active.all():
+            flat_counts[index[escaped]] = iteration
+            flat_glitched[index[glitch]] = True
+            index = index[active]
+            dr = dr[active]
+            di = di[active]
+            if index.size == 0:
+                break
+        dr, di = (2 * (ref_r * dr - ref_i * di) + (dr * dr - di * di),
+                  2 * (ref_r * di + ref_i * dr) + 2 * dr * di)
+
+    return counts, glitched
+
+def render_deep_zoom(c, center, zoom, width=WIDTH, height=HEIGHT, max_iter=MAX_ITER,
+                     glitch_tolerance=GLITCH_TOLERANCE, max_references=MAX_REFERENCES):
+    """Iteration counts for a view far beyond double precision, via perturbation
+
+    center is a (real, imag) pair, best given as decimal strings, and zoom
+    magnifies the default +-3 x +-2 view. One high-precision reference orbit
+    at the center serves the whole frame; pixels it glitches on are
+    re-rendered against a new reference taken from among them. Offsets are
+    float64, so zoom is limited to roughly 1e290.
+    """
+    # Pixel offsets from the center are small but perfectly ordinary floats
+    x = np.arange(width)[np.newaxis, :]
+    y = np.arange(height)[:, np.newaxis]
+    delta = pixel_to_plane(x, y, width, height, 0j, zoom)
+
+    digits = max(30, int(math.log10(zoom * max(width, height))) + 20)
+    re, im = _to_decimal(center[0]), _to_decimal(center[1])
+
+    counts, glitched = escape_time_perturbed(delta, reference_orbit((re, im), c, max_iter, digits),
+                                             max_iter, glitch_tolerance)
+    for _ in range(max_references):
+        ys, xs = np.nonzero(glitched)
+        if len(ys) == 0:
+            break
+
+        # New reference at the middle glitched pixel; offsets are re-based onto it
+        pick = len(ys) // 2
+        ref_delta = delta[ys[pick], xs[pick]]
+        with localcontext() as ctx:
+            ctx.prec = digits
+            ref_re = re + Decimal(ref_delta.real)
+            ref_im = im + Decimal(ref_delta.imag)
+        orbit = reference_orbit((ref_re, ref_im), c, max_iter, digits)
+
+        sub_counts, sub_glitched = escape_time_perturbed(delta[ys, xs] - ref_delta, orbit, max_iter, glitch_tolerance)
+
+        # The reference pixel itself is exact
+        sub_glitched[pick] = False
+        counts[ys, xs] = sub_counts
+        glitched[ys, xs] = sub_glitched
+
+    return counts
+
+def c_path(waypoints, steps, closed=True):
+    """Constants moving in straight lines through waypoints, steps frames per leg"""
+    if closed:
+        waypoints = list(waypoints) + [waypoints[0]]
+    path = []
+    for start, end in zip(waypoints[:-1], waypoints[1:]):
+        path += [start + (end - start) * step / steps for step in range(steps)]
+    if not closed:
+        path.append(waypoints[-1])
+    return path
+
+def animation_counts(cs, width=WIDTH, height=HEIGHT, max_iter=MAX_ITER, memory_budget=ANIMATION_MEMORY):
+    """Yield the iteration counts of each constant in order, iterated as (frames, H, W) stacks
+
+    The starting grid is built once, and as many frames as memory_budget
+    allows are iterated together, each against its own constant.
+    """
+    rows = symmetric_rows(height)
+    z = julia_grid(width, height, 0, rows)
+    batch = max(1, memory_budget // (ANIMATION_BYTES_PER_PIXEL * width * height))
+
+    for start in range(0, len(cs), batch):
+        frame_cs = np.array(cs[start:start + batch], dtype=np.complex128)
+        stack = np.broadcast_to(z, (len(frame_cs),) + z.shape)
+        top = escape_time(stack, frame_cs[:, np.newaxis, np.newaxis], max_iter)
+
+        for c, top_counts in zip(frame_cs, top):
+            counts = np.empty((height, width), dtype=np.int32)
+            counts[:rows] = top_counts
+            _mirror_lower_half(counts, complex(c), max_iter)
+            yield counts
+
+def render_animation(cs, output, width=WIDTH, height=HEIGHT, max_iter=MAX_ITER, fps=30, sequence=False,
+                     memory_budget=ANIMATION_MEMORY):
+    """Render one frame per constant and stream them to disk as they finish
+
+    Writes an animated PNG to output, or with sequence=True a numbered PNG
+    per frame into the directory output. Only the current batch of frames
+    is ever in memory.
+    """
+    palette = julia_palette(max_iter)
+    frames = (palette[counts] for counts in animation_counts(cs, width, height, max_iter, memory_budget))
+
+    if not sequence:
+        write_apng(output, frames, len(cs), fps)
+        return
+
+    os.makedirs(output, exist_ok=True)
+    for i, rgb in enumerate(frames):
+        Image.fromarray(rgb, "RGB").save(os.path.join(output, f"frame_{i+1:05d}.png"), "PNG")
+
+def tile_spacing(level):
+    """Distance between neighbouring samples of a level's tiles"""
+    return TILE_WORLD / (TILE_SIZE * 2.0 ** level)
+
+def tile_points(level, tx, ty, rows=slice(None), cols=slice(None)):
+    """Sample points of tile (level, tx, ty), optionally just some of its rows/columns
+
+    Samples sit at -TILE_WORLD/2 + k * spacing for global sample index k, so
+    every even sample of a tile lands bit-exactly on a sample of its parent.
+    """
+    spacing = tile_spacing(level)
+    k = np.arange(TILE_SIZE)
+    x = -TILE_WORLD / 2 + (tx * TILE_SIZE + k[cols]) * spacing
+    y = -TILE_WORLD / 2 + (ty * TILE_SIZE + k[rows]) * spacing
+    return x[np.newaxis, :] + 1j * y[:, np.newaxis]
+
+def _tile_escape_time(points, c, max_iter):
+    """Julia counts for constant c, or Mandelbrot counts (c taken from the points) if c is None"""
+    if c is None:
+        return escape_time(np.zeros_like(points), points, max_iter)
+    return escape_time(points, c, max_iter)
+
+def tile_path(c, level, tx, ty, max_iter=MAX_ITER, directory=TILE_DIR):
+    """Cache file of one tile; c=None addresses the Mandelbrot set"""
+    key = repr(("mandelbrot",) if c is None else complex(c)) + repr(int(max_iter))
+    return os.path.join(directory, f"tile_{hashlib.sha1(key.encode()).hexdigest()[:12]}_{level}_{tx}_{ty}.npy")
+
+def tile_counts(c, level, tx, ty, max_iter=MAX_ITER, directory=TILE_DIR, cache_bytes=TILE_CACHE_BYTES):
+    """Iteration counts of one TILE_SIZE x TILE_SIZE tile, from the disk cache when possible
+
+    A tile whose parent is cached only iterates the three quarters of its
+    samples that the parent doesn't already have.
+    """
+    path = tile_path(c, level, tx, ty, max_iter, directory)
+    if os.path.exists(path):
+        os.utime(path)
+        return np.load(path)
+
+    parent = tile_path(c, level - 1, tx // 2, ty // 2, max_iter, directory) if level > 0 else None
+    if parent is not None and os.path.exists(parent):
+        os.utime(parent)
+        half = TILE_SIZE // 2
+        quadrant = np.load(parent)[(ty % 2) * half:(ty % 2 + 1) * half, (tx % 2) * half:(tx % 2 + 1) * half]
+
+        counts = np.empty((TILE_SIZE, TILE_SIZE), dtype=np.int32)
+        counts[::2, ::2] = quadrant
+        counts[1::2, :] = _tile_escape_time(tile_points(level, tx, ty, rows=slice(1, None, 2)), c, max_iter)
+        counts[::2, 1::2] = _tile_escape_time(tile_points(level, tx, ty, slice(0, None, 2), slice(1, None, 2)),
+                                               c, max_iter)
+    else:
+        counts = _tile_escape_time(tile_points(level, tx, ty), c, max_iter)
+
+    # Written under a temporary name, so a crash or another explorer
+    # sharing the directory never finds a half-written tile at path
+    os.makedirs(directory, exist_ok=True)
+    with atomic_file(path) as f:
+        np.save(f, counts)
+    evict_lru(directory, cache_bytes, os.path.getsize(path), prefix="tile_", keep=path)
+    return counts
+
+def assemble_view(c, level, center=0j, width=WIDTH, height=HEIGHT, max_iter=MAX_ITER, directory=TILE_DIR,
+                  cache_bytes=TILE_CACHE_BYTES):
+    """Counts for a width x height view at a pyramid level, stitched together from cached tiles
+
+    c=None explores the Mandelbrot set. The view is centered (to the
+    nearest sample) on center; panning and revisiting only renders tiles
+    that aren't cached yet.
+    """
+    spacing = tile_spacing(level)
+    x0 = int(round((center.real + TILE_WORLD / 2) / spacing - width / 2))
+    y0 = int(round((center.imag + TILE_WORLD / 2) / spacing - height / 2))
+
+    counts = np.empty((height, width), dtype=np.int32)
+    for ty in range(y0 // TILE_SIZE, (y0 + height - 1) // TILE_SIZE + 1):
+        for tx in range(x0 // TILE_SIZE, (x0 + width - 1) // TILE_SIZE + 1):
+            tile = tile_counts(c, level, tx, ty, max_iter, directory, cache_bytes)
+
+            # Overlap of this tile with the view, in global sample indices
+            top, bottom = max(y0, ty * TILE_SIZE), min(y0 + height, (ty + 1) * TILE_SIZE)
+            left, right = max(x0, tx * TILE_SIZE), min(x0 + width, (tx + 1) * TILE_SIZE)
+            counts[top - y0:bottom - y0, left - x0:right - x0] = \
+                tile[top - ty * TILE_SIZE:bottom - ty * TILE_SIZE, left - tx * TILE_SIZE:right - tx * TILE_SIZE]
+    return counts
+
+def buffer_path(c, width=WIDTH, height=HEIGHT, max_iter=MAX_ITER, center=0j, zoom=1.0, directory=BUFFER_DIR):
+    """Where the escape-time buffer of one render is cached, keyed by all of its parameters"""
+    key = repr((complex(c), int(width), int(height), int(max_iter), complex(center), float(zoom)))
+    return os.path.join(directory, f"julia_{hashlib.sha1(key.encode()).hexdigest()[:16]}.npy")
+
+def save_buffer(path, counts, smooth_counts):
+    """Store raw and smooth counts side by side in one .npy file"""
+    buffer = np.empty(counts.shape, dtype=[("count", np.int32), ("smooth", np.float32)])
+    buffer["count"] = counts
+    buffer["smooth"] = smooth_counts
+    np.save(path, buffer)
+
+def load_buffer(path):
+    """Memory-map a cached buffer, returning read-only (counts, smooth_counts) views"""
+    buffer = np.load(path, mmap_mode="r")
+    return buffer["count"], buffer["smooth"]
+
+def cached_counts(cs, width=WIDTH, height=HEIGHT, max_iter=MAX_ITER, center=0j, zoom=1.0, workers=1,
+                  directory=BUFFER_DIR):
+    """(counts, smooth_counts) for each constant, rendering and caching only the missing ones"""
+    paths = [buffer_path(c, width, height, max_iter, center, zoom, directory) for c in cs]
+    missing = [(c, path) for c, path in zip(cs, paths) if not os.path.exists(path)]
+
+    if missing:
+        rendered = escape_time_tiled([c for c, _ in missing], width, height, max_iter, workers,
+                                     center=center, zoom=zoom, smooth=True)
+        os.makedirs(directory, exist_ok=True)
+        for (_, path), (counts, smooth_counts) in zip(missing, rendered):
+            save_buffer(path, counts, smooth_counts)
+
+    return [load_buffer(path) for path in paths]
+
+def recolor(counts, smooth_counts, palette, max_iter=MAX_ITER, interior=(0, 0, 0)):
+    """Map cached counts through an (N, 3) uint8 palette, stretched over 0..max_iter
+
+    Exterior pixels are colored by their smooth count, so large palettes give
+    band-free gradients; points that never escaped get the interior color.
+    """
+    palette = np.asarray(palette, dtype=np.uint8)
+    index = np.asarray(smooth_counts, dtype=np.float32) * ((len(palette) - 1) / max_iter)
+    np.clip(index, 0, len(palette) - 1, out=index)
+    rgb = palette[index.astype(np.intp)]
+    rgb[np.asarray(counts) >= max_iter] = interior
+    return rgb
+
+def _band_counts(task):
+    c, width, height, max_iter, center, zoom, row_start, row_stop = task
+    return escape_time(julia_grid(width, height, row_start, row_stop, center, zoom), c, max_iter)
+
+def julia_bands(c, width=WIDTH, height=HEIGHT, max_iter=MAX_ITER, center=0j, zoom=1.0, band_rows=BAND_ROWS,
+                workers=1):
+    """Yield the colored image band_rows rows at a time, top to bottom, for pngstream.write_png
+
+    Bands are handed to a pool of workers but always come back in order,
+    and no more than two per worker are ever waiting, so memory stays
+    bounded however large the frame is.
+    """
+    palette = julia_palette(max_iter)
+    tasks = [
+        (c, width, height, max_iter, center, zoom, row_start, min(row_start + band_rows, height))
+        for row_start in range(0, height, band_rows)
+    ]
+    if workers == 1:
+        for task in tasks:
+            yield palette[_band_counts(task)]
+        return
+
+    with Pool(workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.apply_async(_band_counts, (task,)))
+            if len(pending) >= 2 * workers:
+                yield palette[pending.popleft().get()]
+        while pending:
+            yield palette[pending.popleft().get()]
+
+def generate_julia(c, filename, workers=1, samples=1):
+    counts, _ = cached_counts([c], WIDTH, HEIGHT, MAX_ITER, workers=workers)[0]
+    if samples > 1:
+        img = Image.fromarray(supersample_edges(counts, c, samples, MAX_ITER), "RGB")
+    else:
+        img = Image.fromarray(colorize(counts, MAX_ITER), "RGB")
     img.save(f"julia_wallpapers/{filename}.png", "PNG")
 
-# Generate 10 images
-for i, c in enumerate(constants):
-    print(f"Generating wallpaper {i+1}...")
-    generate_julia(c, f"julia_set_{i+1}")
+def generate_julia_batch(cs, filenames, workers=None):
+    """Render several constants at once, sharing one pool across all of their tiles"""
+    for (counts, _), filename in zip(cached_counts(cs, WIDTH, HEIGHT, MAX_ITER, workers=workers), filenames):
+        img = Image.fromarray(colorize(counts, MAX_ITER), "RGB")
+        img.save(f"julia_wallpapers/{filename}.png", "PNG")
+
+def generate_julia_zoom(c, center, zoom, filename, max_iter=MAX_ITER):
+    """Render a deep-zoom view (see render_deep_zoom) centered on a (real, imag) pair"""
+    counts = render_deep_zoom(c, center, zoom, WIDTH, HEIGHT, max_iter)
+    img = Image.fromarray(colorize(counts, max_iter), "RGB")
+    img.save(f"julia_wallpapers/{filename}.png", "PNG")
+
+def generate_julia_devices(c, filename, workers=None, sizes=DEVICE_SIZES):
+    """Render once at DEVICE_MASTER and write every device size as <filename>_<device>.png"""
+    width, height = DEVICE_MASTER
+    counts, _ = cached_counts([c], width, height, MAX_ITER, workers=workers)[0]
+    img = Image.fromarray(colorize(counts, MAX_ITER), "RGB")
+    return save_device_variants(img, f"julia_wallpapers/{filename}.png", sizes)
+
+def generate_julia_streamed(c, filename, width, height, max_iter=MAX_ITER, center=0j, zoom=1.0, workers=None):
+    """Render a frame of any size (e.g. 15360x8640) straight to PNG, one band at a time"""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    bands = julia_bands(c, width, height, max_iter, center, zoom, workers=workers)
+    write_png(f"julia_wallpapers/{filename}.png", bands, width, height)
+
+def recolor_julia(c, filename, palette, interior=(0, 0, 0)):
+    """Write a new-palette PNG for a constant from its cached buffer, rendering it first if needed"""
+    counts, smooth_counts = cached_counts([c], WIDTH, HEIGHT, MAX_ITER)[0]
+    img = Image.fromarray(recolor(counts, smooth_counts, palette, MAX_ITER, interior), "RGB")
+    img.save(f"julia_wallpapers/{filename}.png", "PNG")
+
+if __name__ == "__main__":
+    # Create output directory
+    os.makedirs("julia_wallpapers", exist_ok=True)
+
+    # Generate 10 images, all tiles of all sets spread over every core
+    print(f"Generating {len(constants)} wallpapers...")
+    generate_julia_batch(constants, [f"julia_set_{i+1}" for i in range(len(constants))])
 
-print("✅ Done. Check the 'julia_wallpapers' folder.")
+    print("✅ Done. Check the 'julia_wallpapers' folder.")
@@ -2,15 +2,26 @@
 from PIL import Image, ImageDraw
 import random
 import math # Import the math module
+import os
+import sys
 
-def generate_floral_wallpaper(width, height, output_filename="floral_wallpaper.png"):
+# Shared helpers live in the repository root, one level up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from devices import DEVICE_MASTER, DEVICE_SIZES, save_device_variants
+
+# Flower, leaf and dot sizes are in pixels of a wallpaper this wide; wider
+# renders scale them up so the design looks the same at any size
+FLORAL_WIDTH = 1080
+
+def floral_image(width, height, unit=1):
     """
-    Generates a floral-themed wallpaper using Python PIL.
+    Draws a floral-themed wallpaper and returns it as a PIL image.
 
     Args:
         width (int): The width of the wallpaper in pixels.
         height (int): The height of the wallpaper in pixels.
-        output_filename (str): The name of the file to save the wallpaper to.
+        unit (float): Pixels per design pixel; flowers, leaves and dots are this many times their
+            FLORAL_WIDTH size. Only sizes are scaled, so the random sequence is the same for any unit.
     """
     # Create a new image with a light background color
     # Using a soft pastel color for the background
@@ -27,7 +38,7 @@ def generate_floral_wallpaper(width, height, output_filename="floral_wallpaper.p
         center_y = random.randint(0, height)
 
         # Random size for the cluster (determines how spread out the flowers are)
-        cluster_radius = random.randint(50, 200)
+        cluster_radius = random.randint(50, 200) * unit
 
         # Number of flowers in this cluster
         num_flowers_in_cluster = random.randint(3, 8)
@@ -60,7 +71,7 @@ def generate_floral_wallpaper(width, height, output_filename="floral_wallpaper.p
 
 
             # Random flower size
-            flower_size = random.randint(20, 60) # Diameter
+            flower_size = int(random.randint(20, 60) * unit) # Diameter
 
             # Draw petals (simple circles around a center)
             num_petals = random.randint(4, 8)
@@ -83,8 +94,8 @@ def generate_floral_wallpaper(width, height, output_filename="floral_wallpaper.p
             # Occasionally draw a simple leaf
             if random.random() < 0.4: # 40% chance of drawing a leaf
                 leaf_color = (random.randint(50, 150), random.randint(100, 200), random.randint(50, 100)) # Green shades
-                leaf_width = random.randint(10, 30)
-                leaf_height = random.randint(20, 50)
+                leaf_width = int(random.randint(10, 30) * unit)
+                leaf_height = int(random.randint(20, 50) * unit)
                 # No need for leaf_angle if not rotating, but keeping for conceptual clarity if you want to add rotation later
                 # leaf_angle = random.uniform(0, 360)
 
@@ -108,23 +119,35 @@ def generate_floral_wallpaper(width, height, output_filename="floral_wallpaper.p
                      random.randint(max(0, dot_color_base[2]-20), min(255, dot_color_base[2]+20)))
         
         # Using a small ellipse for the "dot"
-        draw.ellipse([x-1, y-1, x+1, y+1], fill=dot_color)
+        draw.ellipse([x-unit, y-unit, x+unit, y+unit], fill=dot_color)
 
+    return img
 
+def generate_floral_wallpaper(width, height, output_filename="floral_wallpaper.png"):
+    """
+    Generates a floral-themed wallpaper using Python PIL.
+
+    Args:
+        width (int): The width of the wallpaper in pixels.
+        height (int): The height of the wallpaper in pixels.
+        output_filename (str): The name of the file to save the wallpaper to.
+    """
     # Save the generated image
-    img.save(output_filename)
+    floral_image(width, height).save(output_filename)
     print(f"Floral wallpaper generated and saved as '{output_filename}'")
 
+def generate_floral_devices(output_filename="floral_wallpaper.png", sizes=DEVICE_SIZES):
+    """Draw one wallpaper at DEVICE_MASTER and write every device size as <stem>_<device>.png"""
+    width, height = DEVICE_MASTER
+    paths = save_device_variants(floral_image(width, height, width / FLORAL_WIDTH), output_filename, sizes)
+    print(f"Floral wallpaper generated and saved as {', '.join(paths)}")
+    return paths
+
 if __name__ == "__main__":
-    # Common mobile wallpaper resolutions:
+    # Drawn once at DEVICE_MASTER and written at every common mobile
+    # wallpaper resolution (DEVICE_SIZES):
     # Full HD: 1080x1920
     # QHD: 1440x2560
-    # Higher resolutions for modern phones: 1440x3040, 1242x2688, etc.
-    # Let's use a common one or slightly higher for good quality.
-    mobile_width = 1080
-    mobile_height = 1920
-    # mobile_width = 1440
-    # mobile_height = 2560
-
-    generate_floral_wallpaper(mobile_width, mobile_height, "mobile_floral_wallpaper.png")
+    # Higher resolutions for modern phones: 1440x3040, 2160x3840
+    generate_floral_devices("mobile_floral_wallpaper.png")
 
@@ -1,7 +1,12 @@
 
-from PIL import Image, ImageDraw
 import random
 import math
+import os
+import sys
+
+# Shared helpers live in the repository root, one level up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from indexed import render_shapes
 
 def get_random_pastel_color():
     """Generates a random pastel RGB color."""
@@ -16,8 +21,8 @@ def generate_wallpaper_1_expanding_circles(width, height, output_filename="geome
     """
     Generates a wallpaper with circles expanding from the center in a geometric sequence.
     """
-    img = Image.new('RGB', (width, height), color=get_random_pastel_color())
-    draw = ImageDraw.Draw(img)
+    background = get_random_pastel_color()
+    shapes = []
 
     center_x, center_y = width // 2, height // 2
 
@@ -35,10 +40,11 @@ def generate_wallpaper_1_expanding_circles(width, height, output_filename="geome
         circle_color = get_random_vibrant_color()
 
         # Draw the circle
-        draw.ellipse([center_x - radius, center_y - radius,
-                      center_x + radius, center_y + radius],
-                     outline=circle_color, width=random.randint(1, 5))
+        shapes.append(("ellipse", [center_x - radius, center_y - radius,
+                                   center_x + radius, center_y + radius],
+                       {"outline": circle_color, "width": random.randint(1, 5)}))
 
+    img = render_shapes(width, height, background, shapes)
     img.save(output_filename)
     print(f"Generated {output_filename}")
 
@@ -47,8 +53,8 @@ def generate_wallpaper_2_geometric_grid_squares(width, height, output_filename="
     """
     Generates a wallpaper with a grid of squares, where sizes scale geometrically.
     """
-    img = Image.new('RGB', (width, height), color=get_random_pastel_color())
-    draw = ImageDraw.Draw(img)
+    background = get_random_pastel_color()
+    shapes = []
 
     grid_cols = random.randint(5, 10)
     grid_rows = random.randint(8, 15)
@@ -75,9 +81,10 @@ def generate_wallpaper_2_geometric_grid_squares(width, height, output_filename="
             # Random color for the square
             square_color = get_random_vibrant_color()
 
-            draw.rectangle([square_x1, square_y1, square_x2, square_y2],
-                           fill=square_color)
+            shapes.append(("rectangle", [square_x1, square_y1, square_x2, square_y2],
+                           {"fill": square_color}))
 
+    img = render_shapes(width, height, background, shapes)
     img.save(output_filename)
     print(f"Generated {output_filename}")
 
@@ -86,8 +93,8 @@ def generate_wallpaper_3_spiral_dots(width, height, output_filename="geometric_w
     """
     Generates a wallpaper with dots arranged in a spiral, with sizes scaling geometrically.
     """
-    img = Image.new('RGB', (width, height), color=get_random_pastel_color())
-    draw = ImageDraw.Draw(img)
+    background = get_random_pastel_color()
+    shapes = []
 
     center_x, center_y = width // 2, height // 2
 
@@ -118,13 +125,14 @@ def generate_wallpaper_3_spiral_dots(width, height, output_filename="geometric_w
 
         dot_color = get_random_vibrant_color()
 
-        draw.ellipse([x - dot_radius, y - dot_radius,
-                      x + dot_radius, y + dot_radius],
-                     fill=dot_color)
+        shapes.append(("ellipse", [x - dot_radius, y - dot_radius,
+                                   x + dot_radius, y + dot_radius],
+                       {"fill": dot_color}))
 
         current_angle += angle_step
         current_radius += initial_radius_step * (radius_ratio ** dot_count) # Geometric increase in radius step
 
+    img = render_shapes(width, height, background, shapes)
     img.save(output_filename)
     print(f"Generated {output_filename}")
 
@@ -133,8 +141,8 @@ def generate_wallpaper_4_layered_shapes(width, height, output_filename="geometri
     """
     Generates a wallpaper with layered, geometrically scaled shapes (e.g., rectangles or triangles).
     """
-    img = Image.new('RGB', (width, height), color=get_random_pastel_color())
-    draw = ImageDraw.Draw(img)
+    background = get_random_pastel_color()
+    shapes = []
 
     # Choose a random primary shape to layer
     shape_type = random.choice(['rectangle', 'ellipse'])
@@ -157,9 +165,9 @@ def generate_wallpaper_4_layered_shapes(width, height, output_filename="geometri
         shape_color = get_random_vibrant_color()
 
         if shape_type == 'rectangle':
-            draw.rectangle([x1, y1, x2, y2], fill=shape_color)
+            shapes.append(("rectangle", [x1, y1, x2, y2], {"fill": shape_color}))
         elif shape_type == 'ellipse':
-            draw.ellipse([x1, y1, x2, y2], fill=shape_color)
+            shapes.append(("ellipse", [x1, y1, x2, y2], {"fill": shape_color}))
 
         current_width *= scaling_ratio
         current_height *= scaling_ratio
@@ -167,6 +175,7 @@ def generate_wallpaper_4_layered_shapes(width, height, output_filename="geometri
         if current_width < 10 or current_height < 10: # Stop if shapes get too small
             break
 
+    img = render_shapes(width, height, background, shapes)
     img.save(output_filename)
     print(f"Generated {output_filename}")
 
@@ -175,8 +184,8 @@ def generate_wallpaper_5_geometric_lines(width, height, output_filename="geometr
     """
     Generates a wallpaper with parallel lines where either thickness or spacing scales geometrically.
     """
-    img = Image.new('RGB', (width, height), color=get_random_pastel_color())
-    draw = ImageDraw.Draw(img)
+    background = get_random_pastel_color()
+    shapes = []
 
     # Randomly choose horizontal or vertical lines
     is_horizontal = random.choice([True, False])
@@ -205,15 +214,16 @@ def generate_wallpaper_5_geometric_lines(width, height, output_filename="geometr
             start_y = current_pos
             end_y = current_pos + line_thickness
             if start_y >= height: break
-            draw.line([(0, start_y), (width, start_y)], fill=line_color, width=line_thickness)
+            shapes.append(("line", [(0, start_y), (width, start_y)], {"fill": line_color, "width": line_thickness}))
             current_pos = end_y + random.randint(1, 10) # Add a small random gap
         else: # Vertical lines
             start_x = current_pos
             end_x = current_pos + line_thickness
             if start_x >= width: break
-            draw.line([(start_x, 0), (start_x, height)], fill=line_color, width=line_thickness)
+            shapes.append(("line", [(start_x, 0), (start_x, height)], {"fill": line_color, "width": line_thickness}))
             current_pos = end_x + random.randint(1, 10) # Add a small random gap
 
+    img = render_shapes(width, height, background, shapes)
     img.save(output_filename)
     print(f"Generated {output_filename}")
 
@@ -1,12 +1,14 @@
 
-from PIL import Image, ImageDraw
-n_perlin_wallpaper.py
-import noise # Make sure you 'pip install noise'
 from PIL import Image
+from gradient import CLOUD_RAMP, field_to_rgb
+from perlin import cached_noise_grid, noise3_slices, noise_grid_tiled
+from pngstream import write_apng
+from tiling import tile_array
 import numpy as np
 import random
 
-def create_perlin_noise_wallpaper(width, height, scale, octaves, persistence, lacunarity, output_filename="perlin_wallpaper.png"):
+def create_perlin_noise_wallpaper(width, height, scale, octaves, persistence, lacunarity, output_filename="perlin_wallpaper.png",
+                                  seed=None, workers=None, cached=False, cache_dir=None, tile=None):
     """
     Creates a wallpaper using Perlin noise.
 
@@ -18,50 +20,95 @@ def create_perlin_noise_wallpaper(width, height, scale, octaves, persistence, la
         persistence (float): How much each octave contributes (amplitude).
         lacunarity (float): How much the frequency changes per octave.
         output_filename (str): Name of the output image file.
+        seed (int): Noise base (0-255); random when None. The same seed gives the same wallpaper on any machine.
+        workers (int): Processes sharing the noise tiles; all cores when None.
+        cached (bool): Reuse octaves already computed for this seed and size (see perlin.octave_field), so
+            re-running with a new persistence or more octaves is quick.
+        cache_dir (str): Keep those octaves in this directory as .npy files, so they outlive the session.
+        tile (int): Render one seamless tile x tile square of noise that repeats every tile / scale noise
+            cells, and fill the frame with copies of it, so any size costs one tile. tile / scale and
+            lacunarity must be whole numbers, so every octave's period is a whole number of cells.
     """
-    # Create an empty NumPy array for grayscale pixels
-    pixels = np.zeros((height, width), dtype=np.float64) # Use float for noise values
-
-    seed = random.randint(0, 1000000) # Random base for different noise patterns
-
-    # Generate Perlin noise for each pixel
-    for y in range(height):
-        for x in range(width):
-            # pnoise2 generates 2D Perlin noise
-            # (x/scale, y/scale) gives coordinates for the noise function
-            # octaves, persistence, lacunarity control the detail and texture
-            # repeatx, repeaty can make the noise tileable (useful for game textures, less for wallpapers)
-            # base gives a unique pattern for each seed
-            pixels[y, x] = noise.pnoise2(x / scale,
-                                         y / scale,
-                                         octaves=octaves,
-                                         persistence=persistence,
-                                         lacunarity=lacunarity,
-                                         repeatx=width,
-                                         repeaty=height, # Can set to 0 for non-repeating
-                                         base=seed)
-    
-    # Normalize noise values from their current range to 0-255 (for image pixels)
-    # The noise library returns values typically in a range like -1 to 1 or -0.5 to 0.5.
-    # np.interp maps values from one range to another.
-    normalized_pixels = np.interp(pixels, (pixels.min(), pixels.max()), (0, 255)).astype(np.uint8)
-
-    # --- Apply a simple color map for a "stunning" look ---
-    # Convert grayscale values to RGB using a custom gradient
-    rgb_pixels = np.zeros((height, width, 3), dtype=np.uint8)
-    for y in range(height):
-        for x in range(width):
-            val = normalized_pixels[y, x]
-            # Example: Blueish cloud effect (dark blue to light blue/white)
-            r = int(np.interp(val, [0, 255], [0, 255]))
-            g = int(np.interp(val, [0, 255], [0, 200]))
-            b = int(np.interp(val, [0, 255], [50, 255]))
-            rgb_pixels[y, x] = [r, g, b]
+    if tile is not None and (tile % scale or lacunarity % 1):
+        raise ValueError(f"Expected whole-number tile / scale and lacunarity, got {tile / scale} and {lacunarity}")
+
+    # Random base for different noise patterns; the lattice repeats every 256 bases
+    if seed is None:
+        seed = random.randint(0, 255)
+
+    # Perlin noise for the whole frame, in tiles spread over every core or
+    # summed from cached octaves
+    # (x/scale, y/scale) gives coordinates for the noise function
+    # octaves, persistence, lacunarity control the detail and texture
+    # repeatx, repeaty can make the noise tileable (useful for game textures, less for wallpapers)
+    # base gives a unique pattern for each seed
+    # A tile repeats after tile / scale noise cells, so only that square is rendered
+    field_width, field_height = (width, height) if tile is None else (tile, tile)
+    noise_options = dict(octaves=octaves,
+                         persistence=persistence,
+                         lacunarity=lacunarity,
+                         repeatx=width if tile is None else tile // scale,
+                         repeaty=height if tile is None else tile // scale,
+                         base=seed)
+    if cached or cache_dir is not None:
+        pixels = cached_noise_grid(field_width, field_height, scale, directory=cache_dir, **noise_options)
+    else:
+        pixels = noise_grid_tiled(field_width, field_height, scale, workers=workers, **noise_options)
+
+    # Normalize noise values from their current range and color them with a
+    # custom gradient for a "stunning" look, straight into the output buffer
+    # Example: Blueish cloud effect (dark blue to light blue/white)
+    rgb_pixels = np.empty((field_height, field_width, 3), dtype=np.uint8)
+    field_to_rgb(pixels, CLOUD_RAMP, out=rgb_pixels)
+    if tile is not None:
+        rgb_pixels = tile_array(rgb_pixels, width, height)
 
     img = Image.fromarray(rgb_pixels, 'RGB')
     img.save(output_filename)
     print(f"Generated {output_filename} ({width}x{height})")
 
+def create_perlin_cloud_animation(width, height, scale, octaves, persistence, lacunarity, seconds, fps=30, drift=0.05,
+                                  output_filename="perlin_clouds.png", seed=None, vmin=-1.0, vmax=1.0):
+    """
+    Creates a live wallpaper of slowly drifting clouds: 3D Perlin noise sliced along time, as an animated PNG.
+
+    Args:
+        width, height, scale, octaves, persistence, lacunarity: As for create_perlin_noise_wallpaper.
+        seconds (float): Length of the animation.
+        fps (float): Frames per second; fractional rates such as 29.97 are fine.
+        drift (float): How far through the noise's time axis each second moves. Small values drift slowly.
+        output_filename (str): Name of the output animated PNG file.
+        seed (int): Noise base (0-255); random when None.
+        vmin, vmax (float): Noise values mapped to the ends of CLOUD_RAMP, the same for every frame. The
+            octave sum is normalized by its total amplitude, so the default -1..1 holds every value (a single
+            octave can overshoot 1 by a hair). A narrower range gives more contrast, but values outside it
+            are clipped to the end colors.
+    """
+    num_frames = int(seconds * fps)
+    if num_frames < 1:
+        raise ValueError(f"Expected at least one frame, got {seconds} s at {fps} fps")
+    if seed is None:
+        seed = random.randint(0, 255)
+
+    # Consecutive frames are neighbouring time slices of one 3D noise field,
+    # so the clouds move coherently instead of flickering
+    times = np.arange(num_frames) * (drift / fps)
+    slices = noise3_slices(width, height, scale, times,
+                           octaves=octaves,
+                           persistence=persistence,
+                           lacunarity=lacunarity,
+                           repeatx=width,
+                           repeaty=height,
+                           base=seed)
+
+    # Every frame is colored over one fixed range, so brightness doesn't
+    # pump, into one buffer that the encoder consumes before the next frame
+    # is computed; memory stays flat however long the animation
+    rgb_pixels = np.empty((height, width, 3), dtype=np.uint8)
+    frames = (field_to_rgb(field, CLOUD_RAMP, vmin=vmin, vmax=vmax, out=rgb_pixels) for field in slices)
+    write_apng(output_filename, frames, num_frames, fps)
+    print(f"Generated {output_filename} ({width}x{height}, {num_frames} frames)")
+
 if __name__ == "__main__":
     # Example Usage:
     # Experiment with scale, octaves, persistence, and lacunarity for different effects
@@ -81,52 +128,3 @@ if __name__ == "__main__":
         scale=200.0, octaves=8, persistence=0.55, lacunarity=2.2,
         output_filename="perlin_abstract_4k.png"
     )
-import random
-
-def generate_floral_wallpaper(width, height, output_filename="floral_wallpaper.png"):
-    """
-    Generates a floral-themed wallpaper using Python PIL.
-
-    Args:
-        width (int): The width of the wallpaper in pixels.
-        height (int): The height of the wallpaper in pixels.
-        output_filename (str): The name of the file to save the wallpaper to.
-    """
-    # Create a new image with a light background color
-    # Using a soft pastel color for the background
-    background_color = (random.randint(220, 250), random.randint(220, 250), random.randint(220, 250))
-    img = Image.new('RGB', (width, height), color=background_color)
-    draw = ImageDraw.Draw(img)
-
-    # Number of floral clusters to draw
-    num_clusters = random.randint(15, 30)
-
-    for _ in range(num_clusters):
-        # Random position for the center of the cluster
-        center_x = random.randint(0, width)
-        center_y = random.randint(0, height)
-
-        # Random size for the cluster (determines how spread out the flowers are)
-        cluster_radius = random.randint(50, 200)
-
-        # Number of flowers in this cluster
-        num_flowers_in_cluster = random.randint(3, 8)
-
-        for _ in range(num_flowers_in_cluster):
-            # Random position for each flower within the cluster radius
-            angle = random.uniform(0, 2 * 3.14159)
-            distance = random.uniform(0, cluster_radius)
-            flower_x = int(center_x + distance * random.cos(angle))
-            flower_y = int(center_y + distance * random.sin(angle))
-
-            # Ensure flower position is within image bounds
-            flower_x = max(0, min(width - 1, flower_x))
-            flower_y = max(0, min(height - 1, flower_y))
-
-            # Random flower colors (various shades of pink, purple, red, orange, yellow)
-            flower_colors = [
-                (255, random.randint(150, 200), random.randint(150, 200)), # Pinks/Reds
-                (random.randint(150, 200), 0, random.randint(150, 255)), # Purples
-                (random.randint(200, 255), random.randint(100, 150), 0), # Oranges
-                (random.randint(200, 255), random.randint(200, 255), 0), # Yellows
-                (random.randint(250, 255), random.randint(150, 200), random.randint(150, 255)), # Lavender/Light purples
@@ -0,0 +1,403 @@
+
+from collections import OrderedDict
+from multiprocessing import Pool, shared_memory
+from filecache import atomic_file, evict_lru
+import numpy as np
+import hashlib
+import os
+
+# Lattice tables of the `noise` package's Perlin noise (Ken Perlin's
+# permutation, as its C extension uses it), so pnoise2 below reproduces
+# noise.pnoise2
+PERMUTATION = np.array([
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225, 140, 36, 103, 30, 69, 142,
+    8, 99, 37, 240, 21, 10, 23, 190, 6, 148, 247, 120, 234, 75, 0, 26, 197, 62, 94, 252, 219, 203,
+    117, 35, 11, 32, 57, 177, 33, 88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175, 74, 165,
+    71, 134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122, 60, 211, 133, 230, 220, 105, 92,
+    41, 55, 46, 245, 40, 244, 102, 143, 54, 65, 25, 63, 161, 1, 216, 80, 73, 209, 76, 132, 187, 208,
+    89, 18, 169, 200, 196, 135, 130, 116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64, 52, 217,
+    226, 250, 124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212, 207, 206, 59, 227, 47, 16, 58, 17,
+    182, 189, 28, 42, 223, 183, 170, 213, 119, 248, 152, 2, 44, 154, 163, 70, 221, 153, 101, 155, 167,
+    43, 172, 9, 129, 22, 39, 253, 19, 98, 108, 110, 79, 113, 224, 232, 178, 185, 112, 104, 218, 246, 97,
+    228, 251, 34, 242, 193, 238, 210, 144, 12, 191, 179, 162, 241, 81, 51, 145, 235, 249, 14, 239, 107,
+    49, 192, 214, 31, 181, 199, 106, 157, 184, 84, 204, 176, 115, 121, 50, 45, 127, 4, 150, 254, 138,
+    236, 205, 93, 222, 114, 67, 29, 24, 72, 243, 141, 128, 195, 78, 66, 215, 61, 156, 180,
+], dtype=np.intp)
+GRADIENTS = np.array([
+    (1, 1, 0), (-1, 1, 0), (1, -1, 0), (-1, -1, 0), (1, 0, 1), (-1, 0, 1), (1, 0, -1), (-1, 0, -1),
+    (0, 1, 1), (0, -1, 1), (0, 1, -1), (0, -1, -1), (1, 0, -1), (-1, 0, -1), (0, -1, 1), (0, 1, 1),
+], dtype=np.float32)
+
+# Noise is computed in float32, like the C extension
+NOISE_DTYPE = np.float32
+
+# Side of the square tiles noise_grid_tiled hands to each worker
+NOISE_TILE = 512
+
+# Raw octave fields are kept for re-weighting: in memory, dropped least
+# recently used first once they hold more than OCTAVE_CACHE_BYTES, or as
+# .npy files (loaded as memmaps) when a cache directory is given, deleted
+# least recently used first once they take more than OCTAVE_DISK_BYTES
+OCTAVE_CACHE_BYTES = 512 << 20
+OCTAVE_DIR = "noise_cache"
+OCTAVE_DISK_BYTES = 4 << 30
+
+_octave_cache = OrderedDict()
+
+# Gradient components for every permutation value, so a corner's gradient
+# is a single lookup, and for every (row cell, column hash) pair, so a grid
+# of corners is two takes
+_GRADIENT_X = GRADIENTS[PERMUTATION & 15, 0]
+_GRADIENT_Y = GRADIENTS[PERMUTATION & 15, 1]
+_GRADIENT_Z = GRADIENTS[PERMUTATION & 15, 2]
+_CORNER_HASH = PERMUTATION[(np.arange(256)[:, np.newaxis] + np.arange(256)) & 255]
+_CORNER_X = _GRADIENT_X[_CORNER_HASH]
+_CORNER_Y = _GRADIENT_Y[_CORNER_HASH]
+
+def _lattice(coords, repeat, base):
+    """Permutation-table cells left of and right of each coordinate, and the fractional offset"""
+    coords = np.asarray(coords, dtype=NOISE_DTYPE)
+    repeat = NOISE_DTYPE(repeat)
+    cell = np.floor(np.fmod(coords, repeat)).astype(np.intp)
+    after = np.fmod((cell + 1).astype(NOISE_DTYPE), repeat).astype(np.intp)
+    return (cell & 255) + base, (after & 255) + base, coords - np.floor(coords)
+
+def _fade(t):
+    return t * t * t * (t * (t * NOISE_DTYPE(6) - NOISE_DTYPE(15)) + NOISE_DTYPE(10))
+
+def _corner(hashes, dx, dy):
+    return dx * _GRADIENT_X[hashes] + dy * _GRADIENT_Y[hashes]
+
+def _grid_corner(row_cells, column_hashes, dx, dy):
+    """(H, W) gradient dot products for the corners at row_cells x column_hashes"""
+    gx = _CORNER_X.take(row_cells, 0).take(column_hashes, 1)
+    gy = _CORNER_Y.take(row_cells, 0).take(column_hashes, 1)
+    gx *= dx
+    gy *= dy[:, np.newaxis]
+    gx += gy
+    return gx
+
+def _noise2_grid(x, y, repeatx, repeaty, base):
+    """noise2 over the grid of x (W,) by y (H,)"""
+    i, ii, x = _lattice(x, repeatx, base)
+    j, jj, y = _lattice(y, repeaty, base)
+    fx, fy = _fade(x), _fade(y)[:, np.newaxis]
+    a, b = PERMUTATION[i & 255], PERMUTATION[ii & 255]
+
+    one = NOISE_DTYPE(1)
+    top = _grid_corner(j & 255, a, x, y)
+    top_right = _grid_corner(j & 255, b, x - one, y)
+    top_right -= top
+    top_right *= fx
+    top += top_right
+    bottom = _grid_corner(jj & 255, a, x, y - one)
+    bottom_right = _grid_corner(jj & 255, b, x - one, y - one)
+    bottom_right -= bottom
+    bottom_right *= fx
+    bottom += bottom_right
+    bottom -= top
+    bottom *= fy
+    top += bottom
+    return top
+
+def noise2(x, y, repeatx=1024, repeaty=1024, base=0):
+    """One octave of 2D Perlin noise at every (x, y), broadcasting the two arrays
+
+    Passing x as a (1, W) row and y as an (H, 1) column evaluates the whole
+    grid with the lattice work done per axis. base shifts the permutation
+    table, which repeats every 256, so bases 256 apart give the same noise.
+    """
+    x = np.asarray(x, dtype=NOISE_DTYPE)
+    y = np.asarray(y, dtype=NOISE_DTYPE)
+    if x.ndim == 2 and y.ndim == 2 and x.shape[0] == 1 and y.shape[1] == 1:
+        return _noise2_grid(x[0], y[:, 0], repeatx, repeaty, base)
+
+    i, ii, x = _lattice(x, repeatx, base)
+    j, jj, y = _lattice(y, repeaty, base)
+    fx, fy = _fade(x), _fade(y)
+
+    # The table is periodic, so wrapping indices into it changes nothing
+    # for in-range bases and keeps large ones in bounds
+    a, b = PERMUTATION[i & 255], PERMUTATION[ii & 255]
+    aa, ab = PERMUTATION[(a + j) & 255], PERMUTATION[(a + jj) & 255]
+    ba, bb = PERMUTATION[(b + j) & 255], PERMUTATION[(b + jj) & 255]
+
+    one = NOISE_DTYPE(1)
+    top = _corner(aa, x, y)
+    top += fx * (_corner(ba, x - one, y) - top)
+    bottom = _corner(ab, x, y - one)
+    bottom += fx * (_corner(bb, x - one, y - one) - bottom)
+    bottom -= top
+    bottom *= fy
+    top += bottom
+    return top
+
+def pnoise2(x, y, octaves=1, persistence=0.5, lacunarity=2.0, repeatx=1024, repeaty=1024, base=0):
+    """noise.pnoise2 over whole arrays: fractal sum of octaves, normalized by the total amplitude
+
+    Each octave multiplies frequency (and the repeat periods) by
+    lacunarity and amplitude by persistence. Matches the C extension bit
+    for bit for base 0 and 1. From base 2 up, the C code indexes past the
+    end of its 512-entry table wherever a hash plus a cell index exceeds
+    511, while this wraps around, so those samples can differ.
+    """
+    if octaves <= 0:
+        raise ValueError("Expected octaves value > 0")
+
+    x = np.asarray(x, dtype=NOISE_DTYPE)
+    y = np.asarray(y, dtype=NOISE_DTYPE)
+    if octaves == 1:
+        return noise2(x, y, repeatx, repeaty, base)
+
+    freq, amp = NOISE_DTYPE(1), NOISE_DTYPE(1)
+    total, amplitude = None, NOISE_DTYPE(0)
+    for _ in range(octaves):
+        octave = noise2(x * freq, y * freq, NOISE_DTYPE(repeatx) * freq, NOISE_DTYPE(repeaty) * freq, base)
+        octave *= amp
+        if total is None:
+            total = octave
+        else:
+            total += octave
+        amplitude += amp
+        freq *= NOISE_DTYPE(lacunarity)
+        amp *= NOISE_DTYPE(persistence)
+    total /= amplitude
+    return total
+
+def noise_tile(x_start, x_stop, y_start, y_stop, scale, octaves=1, persistence=0.5, lacunarity=2.0,
+               repeatx=1024, repeaty=1024, base=0):
+    """pnoise2 for pixels [y_start:y_stop, x_start:x_stop] of the field sampled at (x / scale, y / scale)
+
+    Pixel coordinates go straight into the lattice and every pixel is
+    computed independently of its neighbours, so a tile is bit for bit
+    the same region of the whole field.
+    """
+    x = np.arange(x_start, x_stop, dtype=np.float64)[np.newaxis, :] / scale
+    y = np.arange(y_start, y_stop, dtype=np.float64)[:, np.newaxis] / scale
+    return pnoise2(x, y, octaves, persistence, lacunarity, repeatx, repeaty, base)
+
+def noise_grid(width, height, scale, octaves=1, persistence=0.5, lacunarity=2.0, repeatx=1024, repeaty=1024,
+               base=0):
+    """(H, W) pnoise2 field sampled at (x / scale, y / scale) for every pixel"""
+    return noise_tile(0, width, 0, height, scale, octaves, persistence, lacunarity, repeatx, repeaty, base)
+
+def _noise_tile_task(task):
+    """Pool worker: compute one tile and write it into the shared field"""
+    name, width, height, x_start, x_stop, y_start, y_stop, params = task
+
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        field = np.ndarray((height, width), dtype=NOISE_DTYPE, buffer=shm.buf)
+        field[y_start:y_stop, x_start:x_stop] = noise_tile(x_start, x_stop, y_start, y_stop, *params)
+        del field
+    finally:
+        shm.close()
+
+def noise_grid_tiled(width, height, scale, octaves=1, persistence=0.5, lacunarity=2.0, repeatx=1024,
+                     repeaty=1024, base=0, workers=None, tile_size=NOISE_TILE):
+    """noise_grid computed as tile_size squares on a process pool
+
+    The result is bit for bit identical to noise_grid whatever the tile
+    size or worker count, so a seed renders the same field on any machine.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    params = (scale, octaves, persistence, lacunarity, repeatx, repeaty, base)
+    if workers == 1:
+        return noise_grid(width, height, *params)
+
+    shm = shared_memory.SharedMemory(create=True, size=width * height * np.dtype(NOISE_DTYPE).itemsize)
+    try:
+        tasks = [
+            (shm.name, width, height, x_start, min(x_start + tile_size, width), y_start,
+             min(y_start + tile_size, height), params)
+            for y_start in range(0, height, tile_size)
+            for x_start in range(0, width, tile_size)
+        ]
+        with Pool(workers) as pool:
+            for _ in pool.imap_unordered(_noise_tile_task, tasks, chunksize=1):
+                pass
+        return np.ndarray((height, width), dtype=NOISE_DTYPE, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+def _octave_key(width, height, scale, frequency, repeatx, repeaty, base):
+    return (int(base), float(frequency), int(width), int(height), float(scale), float(repeatx), float(repeaty))
+
+def octave_path(key, directory=OCTAVE_DIR):
+    """Cache file of one raw octave field"""
+    return os.path.join(directory, f"octave_{hashlib.sha1(repr(key).encode()).hexdigest()[:16]}.npy")
+
+def octave_field(width, height, scale, frequency, repeatx=1024, repeaty=1024, base=0, directory=None,
+                 cache_bytes=OCTAVE_CACHE_BYTES, disk_bytes=OCTAVE_DISK_BYTES):
+    """(H, W) unweighted noise2 octave at frequency, computed once per (seed, frequency, size, repeat)
+
+    The field is what pnoise2 sums for that octave before scaling it by its
+    amplitude. It is cached in memory (up to cache_bytes), or in directory
+    as a memory-mapped .npy file (up to disk_bytes for the directory);
+    either way the returned array is read-only.
+    """
+    key = _octave_key(width, height, scale, frequency, repeatx, repeaty, base)
+    field = _octave_cache.get(key)
+    if field is not None:
+        _octave_cache.move_to_end(key)
+        return field
+
+    path = octave_path(key, directory) if directory is not None else None
+    if path is not None and os.path.exists(path):
+        os.utime(path)
+    else:
+        frequency = NOISE_DTYPE(frequency)
+        x = np.asarray(np.arange(width, dtype=np.float64)[np.newaxis, :] / scale, dtype=NOISE_DTYPE)
+        y = np.asarray(np.arange(height, dtype=np.float64)[:, np.newaxis] / scale, dtype=NOISE_DTYPE)
+        field = noise2(x * frequency, y * frequency, NOISE_DTYPE(repeatx) * frequency,
+                       NOISE_DTYPE(repeaty) * frequency, base)
+        if path is not None:
+            # Written under a temporary name, so no reader ever maps a partial file
+            os.makedirs(directory, exist_ok=True)
+            with atomic_file(path) as f:
+                np.save(f, field)
+            evict_lru(directory, disk_bytes, os.path.getsize(path), prefix="octave_", suffix=".npy", keep=path)
+
+    if path is not None:
+        # Memory-mapped, so only the page cache holds it
+        return np.load(path, mmap_mode="r")
+
+    field.flags.writeable = False
+    _octave_cache[key] = field
+    while _octave_cache and sum(cached.nbytes for cached in _octave_cache.values()) > cache_bytes:
+        _octave_cache.popitem(last=False)
+    return field
+
+def cached_noise_grid(width, height, scale, octaves=1, persistence=0.5, lacunarity=2.0, repeatx=1024,
+                      repeaty=1024, base=0, directory=None, cache_bytes=OCTAVE_CACHE_BYTES,
+                      disk_bytes=OCTAVE_DISK_BYTES):
+    """noise_grid summed from cached octave fields (see octave_field)
+
+    Changing persistence only redoes the weighted sum, and raising octaves
+    only computes the new octaves; lacunarity changes the frequency of
+    every octave after the first. Bit for bit identical to noise_grid.
+    """
+    if octaves <= 0:
+        raise ValueError("Expected octaves value > 0")
+
+    freq, amp = NOISE_DTYPE(1), NOISE_DTYPE(1)
+    total, amplitude = None, NOISE_DTYPE(0)
+    for _ in range(octaves):
+        octave = octave_field(width, height, scale, freq, repeatx, repeaty, base, directory, cache_bytes,
+                              disk_bytes) * amp
+        if total is None:
+            total = octave
+        else:
+            total += octave
+        amplitude += amp
+        freq *= NOISE_DTYPE(lacunarity)
+        amp *= NOISE_DTYPE(persistence)
+    total /= amplitude
+    return total
+
+def clear_octave_cache():
+    """Drop every octave field cached in memory"""
+    _octave_cache.clear()
+
+def _slice_lattice(x, y, repeatx, repeaty, base):
+    """Everything about one octave of 3D noise that only depends on (x, y), for reuse across time slices"""
+    i, ii, x = _lattice(x, repeatx, base)
+    j, jj, y = _lattice(y, repeaty, base)
+    a, b = PERMUTATION[i & 255], PERMUTATION[ii & 255]
+    hashes = [_CORNER_HASH.take(rows & 255, 0).take(columns, 1).astype(np.uint8)
+              for rows, columns in ((j, a), (j, b), (jj, a), (jj, b))]
+    one = NOISE_DTYPE(1)
+    offsets = [(x, y), (x - one, y), (x, y - one), (x - one, y - one)]
+    return hashes, offsets, _fade(x), _fade(y)[:, np.newaxis]
+
+def _bilinear(corners, fx, fy):
+    """Blend (top-left, top-right, bottom-left, bottom-right) corner fields by fx across and fy down, in place"""
+    top, top_right, bottom, bottom_right = corners
+    top_right -= top
+    top_right *= fx
+    top += top_right
+    bottom_right -= bottom
+    bottom_right *= fx
+    bottom += bottom_right
+    bottom -= top
+    bottom *= fy
+    top += bottom
+    return top
+
+def _slice_layer(lattice, k):
+    """Corners of time cell k folded into two (H, W) fields: the noise at dz = 0 and its slope in dz
+
+    Trilinear blending is linear in the corners' z terms, so a slice
+    anywhere in the cell is flat + dz * slope, however many slices use it.
+    """
+    hashes, offsets, fx, fy = lattice
+    flat, slope = [], []
+    for corner_hashes, (dx, dy) in zip(hashes, offsets):
+        index = corner_hashes + np.uint8(k & 255)
+        gx = _GRADIENT_X[index]
+        gx *= dx
+        gy = _GRADIENT_Y[index]
+        gy *= dy[:, np.newaxis]
+        gx += gy
+        flat.append(gx)
+        slope.append(_GRADIENT_Z[index])
+    return _bilinear(flat, fx, fy), _bilinear(slope, fx, fy)
+
+def noise3_slices(width, height, scale, times, octaves=1, persistence=0.5, lacunarity=2.0, repeatx=1024,
+                  repeaty=1024, repeatz=1024, base=0):
+    """Yield the (H, W) fractal 3D Perlin field at (x / scale, y / scale, t) for each t in times
+
+    Octaves are summed like noise.pnoise3 (which it matches to float32
+    rounding). The (x, y) lattice of every octave is built once, and each
+    time cell's corners are folded into two fields that every slice inside
+    that cell reuses, so consecutive slices of slowly drifting noise cost a
+    few array operations per octave. Only the two cells around the current
+    time are kept per octave, so memory does not grow with len(times).
+    """
+    if octaves <= 0:
+        raise ValueError("Expected octaves value > 0")
+    x = np.asarray(np.arange(width, dtype=np.float64) / scale, dtype=NOISE_DTYPE)
+    y = np.asarray(np.arange(height, dtype=np.float64) / scale, dtype=NOISE_DTYPE)
+
+    octave_state = []
+    freq, amp, amplitude = NOISE_DTYPE(1), NOISE_DTYPE(1), NOISE_DTYPE(0)
+    for _ in range(octaves):
+        lattice = _slice_lattice(x * freq, y * freq, int(repeatx * freq), int(repeaty * freq), base)
+        octave_state.append((freq, amp, int(repeatz * freq), lattice, {}))
+        amplitude += amp
+        freq *= NOISE_DTYPE(lacunarity)
+        amp *= NOISE_DTYPE(persistence)
+
+    one = NOISE_DTYPE(1)
+    for t in times:
+        total = None
+        for freq, amp, period, lattice, layers in octave_state:
+            z = NOISE_DTYPE(t) * freq
+            k, kk, dz = _lattice(z, period, base)
+            k, kk = int(k), int(kk)
+            for cell in list(layers):
+                if cell not in (k, kk):
+                    del layers[cell]
+            for cell in (k, kk):
+                if cell not in layers:
+                    layers[cell] = _slice_layer(lattice, cell)
+
+            flat, slope = layers[k]
+            near = slope * dz
+            near += flat
+            flat, slope = layers[kk]
+            far = slope * (dz - one)
+            far += flat
+            far -= near
+            far *= _fade(dz)
+            near += far
+            near *= amp
+            if total is None:
+                total = near
+            else:
+                total += near
+        if octaves > 1:
+            total /= amplitude
+        yield total
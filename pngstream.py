@@ -0,0 +1,112 @@
+
+from filecache import atomic_file
+from fractions import Fraction
+import numpy as np
+import struct
+import zlib
+
+# zlib level used for every image written here
+COMPRESS_LEVEL = 6
+
+def png_chunk(chunk_type, data):
+    """One length-prefixed, CRC-terminated PNG chunk"""
+    body = chunk_type + data
+    return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+def png_header(width, height):
+    """PNG signature plus the IHDR chunk for an 8-bit RGB image"""
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + png_chunk(b"IHDR", ihdr)
+
+def filter_rows(rgb, previous_row=None):
+    """Scanlines of an (H, W, 3) uint8 array with the PNG "Up" filter applied
+
+    previous_row is the last row of the band above, if any, so bands can be
+    filtered independently and still form one valid image.
+    """
+    rgb = np.ascontiguousarray(rgb, dtype=np.uint8)
+    height, width = rgb.shape[:2]
+
+    rows = np.empty((height, 1 + width * 3), dtype=np.uint8)
+    rows[:, 0] = 2
+    rows[:, 1:] = rgb.reshape(height, -1)
+    rows[1:, 1:] -= rgb[:-1].reshape(height - 1, -1)
+    if previous_row is not None:
+        rows[0, 1:] -= np.asarray(previous_row, dtype=np.uint8).reshape(-1)
+    return rows.tobytes()
+
+def write_apng(path, frames, num_frames, fps=30, loops=0):
+    """Stream an animated PNG to path, encoding each (H, W, 3) frame as it arrives
+
+    frames can be any iterable (typically a generator) of uint8 RGB arrays
+    of one size; only the frame being encoded is held in memory. loops=0
+    repeats forever. fps may be fractional (29.97 or Fraction(30000, 1001));
+    it is stored as the nearest delay fraction whose terms fit 16 bits.
+    Exactly num_frames (at least one) frames must arrive, or ValueError is
+    raised and no file is written.
+    """
+    if num_frames < 1:
+        raise ValueError(f"Expected num_frames >= 1, got {num_frames}")
+    if fps <= 0:
+        raise ValueError(f"Expected fps > 0, got {fps}")
+    rate = Fraction(fps).limit_denominator(0xFFFF)
+    if rate.numerator > 0xFFFF:
+        raise ValueError(f"fps {fps} is too high for an APNG frame delay")
+    sequence = 0
+    written = 0
+    with atomic_file(path) as f:
+        for index, rgb in enumerate(frames):
+            if index >= num_frames:
+                raise ValueError(f"Got more than the {num_frames} frames announced")
+            height, width = rgb.shape[:2]
+            if index == 0:
+                f.write(png_header(width, height))
+                f.write(png_chunk(b"acTL", struct.pack(">II", num_frames, loops)))
+
+            # fcTL: sequence, size, offset, delay = 1/fps s as a 16-bit
+            # numerator/denominator pair, no disposal, overwrite
+            f.write(png_chunk(b"fcTL", struct.pack(">IIIIIHHBB", sequence, width, height, 0, 0,
+                                                   rate.denominator, rate.numerator, 0, 0)))
+            sequence += 1
+
+            data = zlib.compress(filter_rows(rgb), COMPRESS_LEVEL)
+            if index == 0:
+                f.write(png_chunk(b"IDAT", data))
+            else:
+                f.write(png_chunk(b"fdAT", struct.pack(">I", sequence) + data))
+                sequence += 1
+            written += 1
+
+        if written != num_frames:
+            raise ValueError(f"Got {written} frames, expected {num_frames}")
+        f.write(png_chunk(b"IEND", b""))
+
+def write_png(path, bands, width, height):
+    """Stream an RGB PNG to path from an iterable of (rows, W, 3) uint8 bands, top to bottom
+
+    Each band is filtered and fed to one running zlib stream as it
+    arrives, so only the current band (and the last row of the one
+    before) is held in memory however tall the image is. Empty bands are
+    skipped; bands of the wrong width or total height raise ValueError and
+    leave nothing at path.
+    """
+    compressor = zlib.compressobj(COMPRESS_LEVEL)
+    previous_row = None
+    rows = 0
+    with atomic_file(path) as f:
+        f.write(png_header(width, height))
+        for band in bands:
+            if len(band) == 0:
+                continue
+            if band.shape[1] != width:
+                raise ValueError(f"Band is {band.shape[1]} pixels wide, expected {width}")
+            data = compressor.compress(filter_rows(band, previous_row))
+            if data:
+                f.write(png_chunk(b"IDAT", data))
+            previous_row = band[-1]
+            rows += len(band)
+
+        if rows != height:
+            raise ValueError(f"Bands cover {rows} rows, expected {height}")
+        f.write(png_chunk(b"IDAT", compressor.flush()))
+        f.write(png_chunk(b"IEND", b""))
@@ -0,0 +1,23 @@
+
+import numpy as np
+
+def tile_array(tile, width, height, offset=(0, 0)):
+    """Fill a width x height frame by repeating a seamless (h, w, ...) tile
+
+    offset (x, y) is where in the tile the frame's top-left pixel falls.
+    """
+    tile_height, tile_width = tile.shape[:2]
+    ox, oy = offset[0] % tile_width, offset[1] % tile_height
+    reps = (-(-(height + oy) // tile_height), -(-(width + ox) // tile_width)) + (1,) * (tile.ndim - 2)
+    return np.tile(tile, reps)[oy:oy + height, ox:ox + width]
+
+def _wrapped(value, reach, period):
+    copies = [value + d * period for d in (-1, 1)]
+    return [value] + [c for c in copies if c + reach >= 0 and c - reach < period]
+
+def wrap_positions(x, y, reach, tile_width, tile_height):
+    """(x, y) plus its copies one tile over wherever a shape reaching `reach` pixels crosses an edge
+
+    Drawing a shape at every returned position keeps the tile seamless.
+    """
+    return [(px, py) for py in _wrapped(y, reach, tile_height) for px in _wrapped(x, reach, tile_width)]
@@ -1,25 +1,23 @@
 
-from PIL import Image, ImageDraw
+from PIL import ImageDraw
 import math
 import random
-import colorsys
+from colorspace import hsv_to_rgb8
+from gradient import profile_image
 
 # Set dimensions for HD mobile (1080x1920)
 WIDTH = 1080
 HEIGHT = 1920
 
-# Create a new image with gradient background
-img = Image.new('RGB', (WIDTH, HEIGHT))
+# Create a new image with a cosmic gradient background,
+# interpolating between deep blue and purple
+img = profile_image(WIDTH, HEIGHT, (
+    lambda y: 10 + 100 * (y/HEIGHT),
+    lambda y: 20 + 50 * (y/HEIGHT),
+    lambda y: 100 + 100 * (y/HEIGHT),
+))
 draw = ImageDraw.Draw(img)
 
-# Create a cosmic gradient background
-for y in range(HEIGHT):
-    # Interpolate between deep blue and purple
-    r = int(10 + 100 * (y/HEIGHT))
-    g = int(20 + 50 * (y/HEIGHT))
-    b = int(100 + 100 * (y/HEIGHT))
-    draw.line([(0, y), (WIDTH, y)], fill=(r, g, b))
-
 # Function to draw a 3D sphere with proper lighting
 def draw_sphere(draw, center, radius, color):
     x0, y0 = center
@@ -72,7 +70,7 @@ for _ in range(5):
     h = random.uniform(0.6, 0.9)  # Blues and purples
     s = 0.8 + random.random() * 0.2
     v = 0.7 + random.random() * 0.3
-    r, g, b = [int(c * 255) for c in colorsys.hsv_to_rgb(h, s, v)]
+    r, g, b = hsv_to_rgb8(h, s, v).tolist()
     
     draw_sphere(draw, (x, y), radius, (r, g, b))
 
@@ -4,6 +4,10 @@ import math
 import random
 import colorsys
 import os
+from colorspace import hsv_to_rgb8
+from gradient import profile_image
+from tiling import tile_array
+import numpy as np
 
 # Create output directory
 os.makedirs('wallpapers', exist_ok=True)
@@ -16,7 +20,21 @@ HEIGHT = 1920
 font = ImageFont.load_default()
 
 def generate_wallpaper(design_number):
-    img = Image.new('RGB', (WIDTH, HEIGHT), color='black')
+    # Backgrounds built as whole arrays: row profiles evaluated once per
+    # channel and broadcast, or a seamless tile repeated over the frame
+    backgrounds = {
+        2: lambda: profile_image(WIDTH, HEIGHT, PRISMS_BACKGROUND),
+        3: lambda: profile_image(WIDTH, HEIGHT, METAL_BACKGROUND),
+        4: lambda: Image.fromarray(tile_array(cyber_grid_tile(), WIDTH, HEIGHT), 'RGB'),
+        5: lambda: profile_image(WIDTH, HEIGHT, BUBBLES_BACKGROUND),
+        6: lambda: profile_image(WIDTH, HEIGHT, SUNSET_BACKGROUND),
+        9: lambda: profile_image(WIDTH, HEIGHT, WAVES_BACKGROUND)
+    }
+    
+    if design_number in backgrounds:
+        img = backgrounds[design_number]()
+    else:
+        img = Image.new('RGB', (WIDTH, HEIGHT), color='black')
     draw = ImageDraw.Draw(img)
     
     # Select design
@@ -66,13 +84,13 @@ def create_cosmic_nebula(draw):
             draw.ellipse([x-r2, y-r2, x+r2, y+r2], outline=color, width=3)
 
 # Design 2: Geometric Prisms
+PRISMS_BACKGROUND = (
+    lambda i: 50 + 100 * np.abs(np.sin(i * 0.01)),
+    lambda i: 50 + 100 * np.abs(np.sin(i * 0.015 + 1)),
+    lambda i: 50 + 100 * np.abs(np.sin(i * 0.02 + 2)),
+)
+
 def create_geometric_prisms(draw):
-    for i in range(HEIGHT):
-        r = int(50 + 100 * abs(math.sin(i * 0.01)))
-        g = int(50 + 100 * abs(math.sin(i * 0.015 + 1)))
-        b = int(50 + 100 * abs(math.sin(i * 0.02 + 2)))
-        draw.line([(0, i), (WIDTH, i)], fill=(r, g, b))
-    
     for _ in range(7):
         size = random.randint(150, 300)
         x = random.randint(size, WIDTH-size)
@@ -86,11 +104,12 @@ def create_geometric_prisms(draw):
         draw.polygon(points, fill=(int(r*255), int(g*255), int(b*255)), outline=(255, 255, 255))
 
 # Design 3: Liquid Metal
+def _metal_shade(i):
+    return 50 + 150 * np.abs(np.sin(i * 0.005))
+
+METAL_BACKGROUND = (_metal_shade, _metal_shade, _metal_shade)
+
 def create_liquid_metal(draw):
-    for i in range(HEIGHT):
-        shade = int(50 + 150 * abs(math.sin(i * 0.005)))
-        draw.line([(0, i), (WIDTH, i)], fill=(shade, shade, shade))
-    
     for _ in range(5):
         x, y = random.randint(100, WIDTH-100), random.randint(100, HEIGHT-100)
         radius = random.randint(80, 200)
@@ -99,27 +118,27 @@ def create_liquid_metal(draw):
             draw.ellipse([x-r, y-r, x+r, y+r], outline=(shade, shade, shade), width=2)
 
 # Design 4: Cyber Grid
+def cyber_grid_tile(spacing=50):
+    """One seamless grid cell: the dark background with its top and left grid lines"""
+    tile = np.empty((spacing, spacing, 3), dtype=np.uint8)
+    tile[:] = (10, 20, 30)
+    tile[0, :] = tile[:, 0] = (0, 50, 100)
+    return tile
+
 def create_cyber_grid(draw):
-    draw.rectangle([0, 0, WIDTH, HEIGHT], fill=(10, 20, 30))
-    
-    for i in range(0, WIDTH, 50):
-        draw.line([(i, 0), (i, HEIGHT)], fill=(0, 50, 100), width=1)
-    for i in range(0, HEIGHT, 50):
-        draw.line([(0, i), (WIDTH, i)], fill=(0, 50, 100), width=1)
-    
     for _ in range(20):
         x, y = random.randint(0, WIDTH), random.randint(0, HEIGHT)
         r, g, b = colorsys.hsv_to_rgb(random.uniform(0.5, 0.7), 0.9, 0.9)
         draw.ellipse([x-10, y-10, x+10, y+10], fill=(int(r*255), int(g*255), int(b*255)))
 
 # Design 5: Organic Bubbles
+BUBBLES_BACKGROUND = (
+    lambda i: 50 + 50 * np.sin(i * 0.01),
+    lambda i: 100 + 50 * np.sin(i * 0.015),
+    lambda i: 150 + 50 * np.sin(i * 0.02),
+)
+
 def create_organic_bubbles(draw):
-    for i in range(HEIGHT):
-        r = int(50 + 50 * math.sin(i * 0.01))
-        g = int(100 + 50 * math.sin(i * 0.015))
-        b = int(150 + 50 * math.sin(i * 0.02))
-        draw.line([(0, i), (WIDTH, i)], fill=(r, g, b))
-    
     for _ in range(15):
         x, y = random.randint(100, WIDTH-100), random.randint(100, HEIGHT-100)
         radius = random.randint(40, 150)
@@ -131,13 +150,13 @@ def create_organic_bubbles(draw):
             draw.ellipse([x-r2, y-r2, x+r2, y+r2], outline=color, width=2)
 
 # Design 6: Sunset Mountains
+SUNSET_BACKGROUND = (
+    lambda i: 200 - 150 * (i/HEIGHT),
+    lambda i: 100 - 80 * (i/HEIGHT),
+    lambda i: 50 + 50 * (i/HEIGHT),
+)
+
 def create_sunset_mountains(draw):
-    for i in range(HEIGHT):
-        r = int(200 - 150 * (i/HEIGHT))
-        g = int(100 - 80 * (i/HEIGHT))
-        b = int(50 + 50 * (i/HEIGHT))
-        draw.line([(0, i), (WIDTH, i)], fill=(r, g, b))
-    
     for _ in range(3):
         base_y = random.randint(HEIGHT//2, HEIGHT-100)
         points = [(0, HEIGHT)]
@@ -175,34 +194,36 @@ def create_crystal_cave(draw):
         draw.polygon(points, fill=(int(r*255), int(g*255), int(b*255)))
 
 # Design 9: Abstract Waves
+WAVES_BACKGROUND = (
+    lambda i: 50 + 50 * np.sin(i * 0.01),
+    lambda i: 100 + 50 * np.cos(i * 0.015),
+    lambda i: 150 + 50 * np.sin(i * 0.02),
+)
+
 def create_abstract_waves(draw):
-    for i in range(HEIGHT):
-        r = int(50 + 50 * math.sin(i * 0.01))
-        g = int(100 + 50 * math.cos(i * 0.015))
-        b = int(150 + 50 * math.sin(i * 0.02))
-        draw.line([(0, i), (WIDTH, i)], fill=(r, g, b))
-    
     for _ in range(5):
         y_base = random.randint(100, HEIGHT-100)
         amplitude = random.randint(50, 150)
         frequency = random.uniform(0.01, 0.03)
-        for x in range(0, WIDTH, 2):
+        xs = range(0, WIDTH, 2)
+        colors = hsv_to_rgb8([random.uniform(0.4, 0.6) for x in xs], 0.7, 0.9).tolist()
+        for x, color in zip(xs, colors):
             y = y_base + amplitude * math.sin(x * frequency)
-            r, g, b = colorsys.hsv_to_rgb(random.uniform(0.4, 0.6), 0.7, 0.9)
-            draw.line([(x, y), (x, y+10)], fill=(int(r*255), int(g*255), int(b*255)), width=2)
+            draw.line([(x, y), (x, y+10)], fill=tuple(color), width=2)
 
 # Design 10: Fractal Universe
 def create_fractal_universe(draw):
     draw.rectangle([0, 0, WIDTH, HEIGHT], fill=(0, 0, 0))
     
+    # Hue depends only on x + y, so every possible color fits in one table
+    colors = hsv_to_rgb8([i / (WIDTH + HEIGHT) for i in range(WIDTH + HEIGHT + 1)], 0.9, 0.9).tolist()
+    
     for _ in range(5000):
         x = random.randint(0, WIDTH)
         y = random.randint(0, HEIGHT)
         if (x * y) % (x + y + 1) < 10:
             size = random.randint(1, 3)
-            h = (x + y) / (WIDTH + HEIGHT)
-            r, g, b = colorsys.hsv_to_rgb(h, 0.9, 0.9)
-            draw.ellipse([x-size, y-size, x+size, y+size], fill=(int(r*255), int(g*255), int(b*255)))
+            draw.ellipse([x-size, y-size, x+size, y+size], fill=tuple(colors[x + y]))
 
 def apply_final_effects(img, design_number):
     filters = {
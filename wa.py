@@ -1,14 +1,11 @@
 
-from PIL import Image, ImageDraw
+from PIL import ImageDraw
+from indexed import indexed_image
 import random
 
 # Set the dimensions for a mobile wallpaper (1080x1920 is a common mobile resolution)
 WIDTH, HEIGHT = 1080, 1920
 
-# Create a new image with a white background
-image = Image.new("RGB", (WIDTH, HEIGHT), "white")
-draw = ImageDraw.Draw(image)
-
 # Define a list of colors for the shapes
 colors = [
     "#FF6F61",  # Coral
@@ -18,6 +15,11 @@ colors = [
     "#118AB2",  # Blue
 ]
 
+# Create a new image with a white background, on a palette of the shape
+# colors and their black outlines
+image = indexed_image(WIDTH, HEIGHT, "white", colors + ["black"])
+draw = ImageDraw.Draw(image)
+
 # Function to generate random coordinates within bounds
 def random_point(max_x, max_y):
     return (random.randint(0, max_x), random.randint(0, max_y))
@@ -1,64 +1,36 @@
 
-from PIL import Image, ImageDraw, ImageFilter, ImageEnhance
+from PIL import Image, ImageDraw, ImageFilter
 import random
 import math
-import colorsys
-import os
+from colorspace import hsv_to_rgb8
+from gradient import cached_gradient
+from canvas import CANVAS_DTYPE, new_canvas, composite, canvas_to_image
+from tiling import tile_array
 
 # Mobile device resolution (portrait)
 WIDTH = 1080
 HEIGHT = 1920
 
+# Side of the seamless tile rendered by tileable designs
+NEON_TILE = 480
+
 def create_gradient_background(width, height, color1, color2, direction='vertical'):
-    """Create a gradient background between two colors"""
-    image = Image.new('RGB', (width, height))
-    draw = ImageDraw.Draw(image)
-    
-    if direction == 'vertical':
-        for y in range(height):
-            ratio = y / height
-            r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-            g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-            b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-            draw.line([(0, y), (width, y)], fill=(r, g, b))
-    else:  # horizontal
-        for x in range(width):
-            ratio = x / width
-            r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-            g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-            b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-            draw.line([(x, 0), (x, height)], fill=(r, g, b))
-    
-    return image
+    """Create a gradient background canvas between two colors"""
+    mode = 'vertical' if direction == 'vertical' else 'horizontal'
+    return cached_gradient(width, height, [color1, color2], mode, dtype=CANVAS_DTYPE).copy()
 
 def create_radial_gradient(width, height, center_color, edge_color):
-    """Create a radial gradient from center to edges"""
-    image = Image.new('RGB', (width, height))
-    draw = ImageDraw.Draw(image)
-    
-    center_x, center_y = width // 2, height // 2
-    max_radius = math.sqrt((width/2)**2 + (height/2)**2)
-    
-    for y in range(height):
-        for x in range(width):
-            distance = math.sqrt((x - center_x)**2 + (y - center_y)**2)
-            ratio = min(distance / max_radius, 1.0)
-            
-            r = int(center_color[0] * (1 - ratio) + edge_color[0] * ratio)
-            g = int(center_color[1] * (1 - ratio) + edge_color[1] * ratio)
-            b = int(center_color[2] * (1 - ratio) + edge_color[2] * ratio)
-            
-            draw.point((x, y), fill=(r, g, b))
-    
-    return image
+    """Create a radial gradient canvas from center to edges"""
+    return cached_gradient(width, height, [center_color, edge_color], 'radial', dtype=CANVAS_DTYPE,
+                           center=(width // 2, height // 2),
+                           extent=math.sqrt((width/2)**2 + (height/2)**2)).copy()
 
 def wallpaper_1_geometric_sunset():
     """Geometric shapes with warm sunset colors"""
     print("Generating Wallpaper 1: Geometric Sunset")
     
     # Create gradient background
-    image = create_gradient_background(WIDTH, HEIGHT, (255, 94, 77), (255, 154, 0))
-    draw = ImageDraw.Draw(image)
+    canvas = create_gradient_background(WIDTH, HEIGHT, (255, 94, 77), (255, 154, 0))
     
     # Add geometric shapes
     colors = [(255, 206, 84, 180), (255, 118, 117, 150), (162, 155, 254, 120)]
@@ -81,7 +53,7 @@ def wallpaper_1_geometric_sunset():
         overlay_draw = ImageDraw.Draw(overlay)
         overlay_draw.polygon(points, fill=color)
         
-        image = Image.alpha_composite(image.convert('RGBA'), overlay).convert('RGB')
+        composite(canvas, overlay)
     
     # Add circles
     for _ in range(10):
@@ -94,7 +66,9 @@ def wallpaper_1_geometric_sunset():
         overlay_draw = ImageDraw.Draw(overlay)
         overlay_draw.ellipse([x-radius, y-radius, x+radius, y+radius], fill=color)
         
-        image = Image.alpha_composite(image.convert('RGBA'), overlay).convert('RGB')
+        composite(canvas, overlay)
+    
+    image = canvas_to_image(canvas, dither=True)
     
     # Apply subtle blur
     image = image.filter(ImageFilter.GaussianBlur(radius=0.5))
@@ -106,8 +80,7 @@ def wallpaper_2_ocean_waves():
     print("Generating Wallpaper 2: Ocean Waves")
     
     # Create base gradient
-    image = create_gradient_background(WIDTH, HEIGHT, (0, 119, 190), (0, 180, 216))
-    draw = ImageDraw.Draw(image)
+    canvas = create_gradient_background(WIDTH, HEIGHT, (0, 119, 190), (0, 180, 216))
     
     # Create wave patterns
     wave_colors = [(64, 224, 208, 100), (72, 209, 204, 120), (0, 206, 209, 80)]
@@ -127,7 +100,7 @@ def wallpaper_2_ocean_waves():
         overlay_draw = ImageDraw.Draw(overlay)
         overlay_draw.polygon(points, fill=random.choice(wave_colors))
         
-        image = Image.alpha_composite(image.convert('RGBA'), overlay).convert('RGB')
+        composite(canvas, overlay)
     
     # Add bubble effects
     for _ in range(50):
@@ -140,51 +113,58 @@ def wallpaper_2_ocean_waves():
         overlay_draw.ellipse([x-radius, y-radius, x+radius, y+radius], 
                            fill=(255, 255, 255, 60))
         
-        image = Image.alpha_composite(image.convert('RGBA'), overlay).convert('RGB')
+        composite(canvas, overlay)
     
-    return image
+    return canvas_to_image(canvas, dither=True)
 
-def wallpaper_3_neon_grid():
-    """Cyberpunk-style neon grid pattern"""
+def wallpaper_3_neon_grid(tileable=False):
+    """Cyberpunk-style neon grid pattern
+
+    With tileable=True a single seamless NEON_TILE square is rendered, with
+    the grid shifted half a cell so no line or node touches its edges, and
+    repeated over the frame.
+    """
     print("Generating Wallpaper 3: Neon Grid")
     
-    # Dark background
-    image = Image.new('RGB', (WIDTH, HEIGHT), (20, 20, 40))
-    draw = ImageDraw.Draw(image)
-    
     # Grid lines
     grid_spacing = 60
+    width, height = (NEON_TILE, NEON_TILE) if tileable else (WIDTH, HEIGHT)
+    start = grid_spacing // 2 if tileable else 0
+    
+    # Dark background
+    canvas = new_canvas(width, height, (20, 20, 40))
+    
     neon_colors = [(255, 0, 255), (0, 255, 255), (255, 255, 0), (0, 255, 0)]
     
     # Vertical lines
-    for x in range(0, WIDTH, grid_spacing):
+    for x in range(start, width, grid_spacing):
         color = random.choice(neon_colors)
         alpha = random.randint(100, 200)
         
-        overlay = Image.new('RGBA', (WIDTH, HEIGHT), (0, 0, 0, 0))
+        overlay = Image.new('RGBA', (width, height), (0, 0, 0, 0))
         overlay_draw = ImageDraw.Draw(overlay)
-        overlay_draw.line([(x, 0), (x, HEIGHT)], fill=(*color, alpha), width=2)
+        overlay_draw.line([(x, 0), (x, height)], fill=(*color, alpha), width=2)
         
-        image = Image.alpha_composite(image.convert('RGBA'), overlay).convert('RGB')
+        composite(canvas, overlay)
     
     # Horizontal lines
-    for y in range(0, HEIGHT, grid_spacing):
+    for y in range(start, height, grid_spacing):
         color = random.choice(neon_colors)
         alpha = random.randint(100, 200)
         
-        overlay = Image.new('RGBA', (WIDTH, HEIGHT), (0, 0, 0, 0))
+        overlay = Image.new('RGBA', (width, height), (0, 0, 0, 0))
         overlay_draw = ImageDraw.Draw(overlay)
-        overlay_draw.line([(0, y), (WIDTH, y)], fill=(*color, alpha), width=2)
+        overlay_draw.line([(0, y), (width, y)], fill=(*color, alpha), width=2)
         
-        image = Image.alpha_composite(image.convert('RGBA'), overlay).convert('RGB')
+        composite(canvas, overlay)
     
     # Add glowing nodes at intersections
-    for x in range(0, WIDTH, grid_spacing):
-        for y in range(0, HEIGHT, grid_spacing):
+    for x in range(start, width, grid_spacing):
+        for y in range(start, height, grid_spacing):
             if random.random() < 0.3:  # 30% chance for a node
                 color = random.choice(neon_colors)
                 
-                overlay = Image.new('RGBA', (WIDTH, HEIGHT), (0, 0, 0, 0))
+                overlay = Image.new('RGBA', (width, height), (0, 0, 0, 0))
                 overlay_draw = ImageDraw.Draw(overlay)
                 
                 # Draw glowing effect
@@ -193,7 +173,12 @@ def wallpaper_3_neon_grid():
                     overlay_draw.ellipse([x-radius, y-radius, x+radius, y+radius], 
                                        fill=(*color, alpha))
                 
-                image = Image.alpha_composite(image.convert('RGBA'), overlay).convert('RGB')
+                composite(canvas, overlay)
+    
+    if tileable:
+        canvas = tile_array(canvas, WIDTH, HEIGHT, (start, start))
+    
+    image = canvas_to_image(canvas, dither=True)
     
     # Apply glow effect
     image = image.filter(ImageFilter.GaussianBlur(radius=1))
@@ -205,7 +190,7 @@ def wallpaper_4_marble_texture():
     print("Generating Wallpaper 4: Marble Texture")
     
     # Create base with noise
-    image = Image.new('RGB', (WIDTH, HEIGHT), (240, 240, 245))
+    canvas = new_canvas(WIDTH, HEIGHT, (240, 240, 245))
     
     # Create marble veins
     vein_colors = [(180, 180, 190), (160, 160, 175), (200, 195, 210)]
@@ -232,7 +217,9 @@ def wallpaper_4_marble_texture():
             color = random.choice(vein_colors)
             overlay_draw.line([points[i], points[i+1]], fill=(*color, 120), width=thickness)
         
-        image = Image.alpha_composite(image.convert('RGBA'), overlay).convert('RGB')
+        composite(canvas, overlay)
+    
+    image = canvas_to_image(canvas, dither=True)
     
     # Add subtle texture
     for _ in range(1000):
@@ -253,7 +240,7 @@ def wallpaper_5_abstract_flowers():
     print("Generating Wallpaper 5: Abstract Flowers")
     
     # Soft gradient background
-    image = create_gradient_background(WIDTH, HEIGHT, (255, 240, 245), (240, 255, 240))
+    canvas = create_gradient_background(WIDTH, HEIGHT, (255, 240, 245), (240, 255, 240))
     
     # Flower colors
     flower_colors = [
@@ -291,7 +278,9 @@ def wallpaper_5_abstract_flowers():
         overlay_draw.ellipse([center_x - 15, center_y - 15, center_x + 15, center_y + 15],
                            fill=center_color)
         
-        image = Image.alpha_composite(image.convert('RGBA'), overlay).convert('RGB')
+        composite(canvas, overlay)
+    
+    image = canvas_to_image(canvas, dither=True)
     
     # Add soft blur for dreamy effect
     image = image.filter(ImageFilter.GaussianBlur(radius=1))
@@ -303,7 +292,7 @@ def wallpaper_6_geometric_prisms():
     print("Generating Wallpaper 6: Geometric Prisms")
     
     # Dark gradient background
-    image = create_gradient_background(WIDTH, HEIGHT, (30, 30, 50), (50, 30, 80))
+    canvas = create_gradient_background(WIDTH, HEIGHT, (30, 30, 50), (50, 30, 80))
     
     # Prism colors
     prism_colors = [
@@ -345,16 +334,16 @@ def wallpaper_6_geometric_prisms():
             edge_color = tuple(int(c * 0.8) if i < 3 else c for i, c in enumerate(color))
             overlay_draw.polygon(edge_points, fill=edge_color)
         
-        image = Image.alpha_composite(image.convert('RGBA'), overlay).convert('RGB')
+        composite(canvas, overlay)
     
-    return image
+    return canvas_to_image(canvas, dither=True)
 
 def wallpaper_7_particle_explosion():
     """Particle explosion effect"""
     print("Generating Wallpaper 7: Particle Explosion")
     
     # Dark radial gradient
-    image = create_radial_gradient(WIDTH, HEIGHT, (80, 20, 120), (20, 20, 40))
+    canvas = create_radial_gradient(WIDTH, HEIGHT, (80, 20, 120), (20, 20, 40))
     
     # Explosion center
     center_x, center_y = WIDTH // 2, HEIGHT // 2
@@ -393,16 +382,16 @@ def wallpaper_7_particle_explosion():
                 overlay_draw.ellipse([x-radius, y-radius, x+radius, y+radius],
                                    fill=(*color, particle_alpha))
             
-            image = Image.alpha_composite(image.convert('RGBA'), overlay).convert('RGB')
+            composite(canvas, overlay)
     
-    return image
+    return canvas_to_image(canvas, dither=True)
 
 def wallpaper_8_liquid_metal():
     """Liquid metal effect with metallic colors"""
     print("Generating Wallpaper 8: Liquid Metal")
     
     # Metallic gradient background
-    image = create_gradient_background(WIDTH, HEIGHT, (80, 80, 90), (120, 120, 130))
+    canvas = create_gradient_background(WIDTH, HEIGHT, (80, 80, 90), (120, 120, 130))
     
     # Metallic blob colors
     metal_colors = [
@@ -446,7 +435,9 @@ def wallpaper_8_liquid_metal():
                             highlight_x + highlight_radius, highlight_y + highlight_radius],
                            fill=highlight_color)
         
-        image = Image.alpha_composite(image.convert('RGBA'), overlay).convert('RGB')
+        composite(canvas, overlay)
+    
+    image = canvas_to_image(canvas, dither=True)
     
     # Apply blur for smooth liquid effect
     image = image.filter(ImageFilter.GaussianBlur(radius=2))
@@ -458,7 +449,11 @@ def wallpaper_9_rainbow_spirals():
     print("Generating Wallpaper 9: Rainbow Spirals")
     
     # Black background
-    image = Image.new('RGB', (WIDTH, HEIGHT), (10, 10, 15))
+    canvas = new_canvas(WIDTH, HEIGHT, (10, 10, 15))
+    
+    # Rainbow colors for the 300 spiral points, shared by every spiral
+    hues = [(i * 2) % 360 / 360 for i in range(300)]
+    spiral_colors = hsv_to_rgb8(hues, 1.0, 1.0).tolist()
     
     # Create multiple spirals
     for spiral in range(6):
@@ -480,17 +475,14 @@ def wallpaper_9_rainbow_spirals():
             y = center_y + int(radius * math.sin(angle))
             
             if 0 <= x < WIDTH and 0 <= y < HEIGHT:
-                # HSV to RGB for rainbow effect
-                hue = (i * 2) % 360
-                saturation = 1.0
-                value = 1.0
-                rgb = colorsys.hsv_to_rgb(hue/360, saturation, value)
-                color = (int(rgb[0]*255), int(rgb[1]*255), int(rgb[2]*255), 150)
+                color = (*spiral_colors[i], 150)
                 
                 # Draw small circle at each point
                 overlay_draw.ellipse([x-3, y-3, x+3, y+3], fill=color)
         
-        image = Image.alpha_composite(image.convert('RGBA'), overlay).convert('RGB')
+        composite(canvas, overlay)
+    
+    image = canvas_to_image(canvas, dither=True)
     
     # Apply glow effect
     image = image.filter(ImageFilter.GaussianBlur(radius=1))
@@ -502,7 +494,7 @@ def wallpaper_10_crystalline_structure():
     print("Generating Wallpaper 10: Crystalline Structure")
     
     # Gradient background
-    image = create_gradient_background(WIDTH, HEIGHT, (20, 25, 40), (40, 30, 60))
+    canvas = create_gradient_background(WIDTH, HEIGHT, (20, 25, 40), (40, 30, 60))
     
     # Crystal colors
     crystal_colors = [
@@ -1,13 +1,5 @@
 
-from PIL import Image
-import math
-
-def interpolate_color(c1, c2, factor):
-    """Linearly interpolate between two RGB colors based on factor (0 to 1)."""
-    return tuple([
-        int(c1[i] + (c2[i] - c1[i]) * factor)
-        for i in range(3)
-    ])
+from gradient import cached_gradient_image
 
 def generate_gradient(width, height, colors, direction='horizontal'):
     """
@@ -22,38 +14,16 @@ def generate_gradient(width, height, colors, direction='horizontal'):
     Returns:
         Image: PIL Image with gradient.
     """
-    image = Image.new('RGB', (width, height))
-    pixels = image.load()
-
-    for y in range(height):
-        for x in range(width):
-            # Determine interpolation factor
-            if direction == 'horizontal':
-                factor = x / (width - 1)
-            elif direction == 'vertical':
-                factor = y / (height - 1)
-            elif direction == 'diagonal':
-                factor = (x + y) / (width + height - 2)
-            elif direction == 'radial':
-                cx, cy = width / 2, height / 2
-                dx, dy = x - cx, y - cy
-                dist = math.sqrt(dx ** 2 + dy ** 2)
-                max_dist = math.sqrt(cx ** 2 + cy ** 2)
-                factor = dist / max_dist
-            else:
-                raise ValueError("Invalid direction")
-
-            # Clamp factor and determine color stops
-            factor = min(max(factor, 0), 1)
-            index = int(factor * (len(colors) - 1))
-            local_factor = (factor * (len(colors) - 1)) % 1
-
-            c1 = colors[index]
-            c2 = colors[min(index + 1, len(colors) - 1)]
-            color = interpolate_color(c1, c2, local_factor)
-            pixels[x, y] = color
-
-    return image
+    extents = {
+        'horizontal': width - 1,
+        'vertical': height - 1,
+        'diagonal': width + height - 2,
+        'radial': None,
+    }
+    if direction not in extents:
+        raise ValueError("Invalid direction")
+
+    return cached_gradient_image(width, height, colors, direction, extent=extents[direction])
 
 if __name__ == '__main__':
     # Wallpaper 1: Horizontal gradient (blue to green)